@@ -1,25 +1,68 @@
+import time
+_LAUNCHED = time.perf_counter()  # first paint is reported relative to this (see boggle_startup_profile)
 import tkinter as tk
 from tkinter import messagebox
-from PIL import Image, ImageTk
-import time
+import os
+import math
+import queue
+import random
+import threading
+import traceback
 from boggle_utils import *
+from boggle_languages import ENGLISH, get_language
+import boggle_metrics
 import sys
 from boggle_board_randomizer import *
 
 TIMER_SECONDS = 300
+HINT_COST = 30
+WORKER_POLL_MS = 50
+BOARD_POOL_PATH = "boards_pool.jsonl"
+BOARD_POOL_SIZE = 20
+GAME_LOG_PATH = "boggle_games.log"  # every game is appended here (see boggle_replay)
+FIRST_PAINT_ENV = "BOGGLE_REPORT_FIRST_PAINT"  # when set, print the time to first paint and quit
 FONT_SIZE = 12
+DIE_FONT = ("Helvetica", 30, "bold")  # for dice that have no image and show their letter as text
+DIE_IMAGE_NAMES = {"QU": "q"}  # die letters whose image isn't named after the letter
 BUTTON_STYLE = {"height": 93, "width": 93, "borderwidth": 1,
                 "relief": tk.FLAT}
+LEGAL_DIE_COLOR = "#a5d6a7"
+CHOSEN_DIE_COLOR = "#90caf9"
+DEAD_END_COLOR = "#c62828"
 
 
 class BoggleModel:
     """Logic class of Boggle! Deals with backend calculations."""
-    def __init__(self):
-        """A method that initializes instance variables."""
-        self._board = randomize_board(LETTERS)
+    def __init__(self, board=None, board_size=BOARD_SIZE, dice_list=None, game_log=None, rng=None, seed=None,
+                 language=ENGLISH):
+        """A method that initializes instance variables. A random board of board_size x board_size is drawn from
+        dice_list (by default the language's dice set of that size) unless a board is given. Words are checked
+        against the language's dictionary (see boggle_languages).
+        Boards and hints are drawn with 'rng' (a random.Random, by default the random module's). Given a seed
+        instead, the board is the seed's board (see board_from_seed), hints are drawn from a generator seeded with
+        it, and the default dice's solutions come from the solve_seed cache, so the game can be replayed exactly.
+        If a game_log is given (see boggle_replay.GameLog), the game's submits and hints are recorded in it."""
+        if rng is None:
+            rng = random.Random(seed) if seed is not None else random
+        # Only a seed's board with the default English dice is what solve_seed solves
+        self._seed = seed if board is None and dice_list is None and language is ENGLISH else None
+        if board is None:
+            dice_list = dice_list or language.get_dice_set(board_size)
+            if seed is not None:
+                board = board_from_seed(seed, board_size, dice_list)
+            else:
+                board = randomize_board(dice_list, board_size, rng)
+        self._board = board
+        self._language = language
+        self._board_size = board_size
+        self._rng = rng
         self._path = []
-        self._words = load_words_dict(file_path="boggle_dict.txt")
-        self._guessed_words = []
+        self._cursor = None  # PathCursor following self._path, built on the first press
+        self._words = None  # loaded on first use (see _get_words), usually by the background solve
+        self._guessed_words = []  # in the order they were found, for display
+        self._guessed_set = set()
+        self._unfound_words = None  # SolutionIndex, built on first use
+        self._game_log = game_log
         self.points = 0
         self.message = ""
 
@@ -41,40 +84,90 @@ class BoggleModel:
     def set_path(self, path):
         """A setter method for self._path"""
         self._path = path
+        self._cursor = None
+
+    def press_die(self, row, col):
+        """A method that adds a die to the path if it is unused and next to the last die.
+        Returns False, leaving the path as it was, if it isn't."""
+        if not self._get_cursor().press(row, col):
+            return False
+        self._path.append((row, col))
+        return True
+
+    def get_legal_moves(self):
+        """A method that returns the coordinates of the dice that may be added to the path."""
+        return self._get_cursor().get_legal_moves()
+
+    def path_is_prefix(self):
+        """A method that checks if some word starts with the path. If not, the path is a dead end."""
+        return self._get_cursor().is_prefix()
+
+    def path_is_word(self):
+        """A method that checks if the path spells a word."""
+        return self._get_cursor().is_word()
+
+    def _get_cursor(self):
+        """A helper method that returns the PathCursor of the path, rebuilding it after set_path.
+        A path that was set with an illegal move is followed up to that move."""
+        if self._cursor is None:
+            self._cursor = PathCursor(self._board, self._get_words())
+            for row, col in self._path:
+                if not self._cursor.press(row, col):
+                    break
+        return self._cursor
+
+    def _clear_path(self):
+        """A helper method that empties the path after a submit."""
+        self._path = []
+        if self._cursor is not None:
+            self._cursor.reset()
 
+    @boggle_metrics.timed("submit_is_pressed")
     def submit_is_pressed(self):
         """A method that performs actions if the submit button is pressed."""
         # If not enough letters are entered:
-        if len(self._path) < 3:
+        if len(self._path) < MIN_PATH_LENGTH:
             self._show_message("Not enough letters entered")
+            self._log_submit()
             return
         # When enough letters are entered:
-        word = is_valid_path(self._board, self._path, self._words)
+        word = is_valid_path(self._board, self._path, self._get_words())
         # If the word is not a valid word:
         if word is None:
             self._show_message("Word is incorrect")
-            self._path = []
+            self._log_submit()
+            self._clear_path()
             return
         # If the word was already chosen
-        if word in self._guessed_words:
+        if word in self._guessed_set:
             self._show_message("Word has already been chosen")
-            self._path = []
+            self._log_submit()
+            self._clear_path()
             return
         # When a new word found in the dictionary, 3-16 letters long, with a valid path on the board is chosen.
         else:
             self._add_points(word)
             self._add_word_to_wordlist(word)
             self._show_message("Word is correct!")
-            self._path = []
+            self._log_submit()
+            self._clear_path()
+
+    def _log_submit(self):
+        """A helper method that records the submitted path and the points after it, if the game is logged."""
+        if self._game_log is not None:
+            self._game_log.log_submit(self._path, self.points)
 
     def _add_points(self, word):
         """A helper method that calculates the number of points to be awarded."""
-        self.points += len(word)**2
+        self.points += score_word(word)
         return self.points
 
     def _add_word_to_wordlist(self, word):
         """A helper method that adds a correct word to the guessed word list."""
         self._guessed_words.append(word)
+        self._guessed_set.add(word)
+        if self._unfound_words is not None:
+            self._unfound_words.remove(word)
         return self._guessed_words
 
     def _show_message(self, msg):
@@ -82,45 +175,135 @@ class BoggleModel:
         self.message = msg
         return self.message
 
+    @boggle_metrics.timed("get_hint")
     def get_hint(self):
-        """A method that returns a random valid word on the board that has yet been found."""
-        length_of_word = random.randint(3,16)
-        words_and_coords = find_length_n_words(length_of_word, self._board, self._words)  # returns a list of tuples
-        words = self._get_words(words_and_coords)  # retrieves the words from each tuple
-        words = self._loop_until_words_found(words)
-        word = random.choice(words)
-        word = self._loop_until_new_word(word, words)
+        """A method that returns a random valid word on the board that has yet been found.
+        Returns None if every word on the board has been found."""
+        return self._get_unfound_words().random_word(self._rng)
+
+    def take_hint(self):
+        """A method that gives a hint (see get_hint) and takes HINT_COST points for it, if there was a word left."""
+        word = self.get_hint()
+        cost = HINT_COST if word is not None else 0
+        self.points -= cost
+        if self._game_log is not None:
+            self._game_log.log_hint(word, cost)
         return word
 
-    def _get_words(self, words_and_coords):
-        """A helper method that extracts only the words from the word/coordinate tuple-list."""
-        words = []
-        for word_and_coord in words_and_coords:
-            words.append(word_and_coord[0])
-        return words
-
-    def _loop_until_words_found(self, words):
-        """A helper method that runs until a list of at least one word of a randomized length had been found."""
-        while not words:
-            length_of_word = random.randint(3, 16)
-            words_and_coords = find_length_n_words(length_of_word, self._board, self._words)
-            words = self._get_words(words_and_coords)
-        return words
-
-    def _loop_until_new_word(self, word, words):
-        """A helper method that runs until the hint-word has yet been chosen."""
-        while word in self._guessed_words:
-            word = random.choice(words)
-        return word
+    def set_game_log(self, game_log):
+        """A setter method for the game log the model records the game in."""
+        self._game_log = game_log
+
+    def start_game(self):
+        """A method that marks the start of the game (when the timer starts) in the game log, if there is one."""
+        if self._game_log is not None:
+            self._game_log.start_game(self._board, HINT_COST, self._language)
+
+    def end_game(self):
+        """A method that records the end of the game and its final points in the game log, if there is one."""
+        if self._game_log is not None:
+            self._game_log.end_game(self.points)
+
+    def solve(self):
+        """A method that solves the board and returns its playable words, without changing the model.
+        Words that need fewer dice than a submitted path are left out, since they can't be guessed.
+        Safe to call from a worker thread; pass the result to set_solutions on the main thread."""
+        if self._seed is not None:
+            return get_playable_words(solve_seed(self._seed, self._get_words(), self._board_size)[1])
+        return get_playable_words(solve_board(self._board, self._get_words()))
+
+    def set_solutions(self, solutions):
+        """A setter method for the words on the board (see solve). Words already guessed are removed."""
+        self._unfound_words = SolutionIndex(solutions)
+        for word in self._guessed_words:
+            self._unfound_words.remove(word)
+
+    def is_solved(self):
+        """A method that checks if the board's solutions are known, making get_hint instant."""
+        return self._unfound_words is not None
+
+    def _get_words(self):
+        """A helper method that returns the shared dictionary, loading it the first time it is needed."""
+        if self._words is None:
+            self._words = self._language.get_words()
+        return self._words
+
+    def _get_unfound_words(self):
+        """A helper method that solves the board once and returns the index of the words that are still to be found."""
+        if self._unfound_words is None:
+            self.set_solutions(self.solve())
+        return self._unfound_words
+
+
+class BackgroundWorker:
+    """Runs slow model calls on a worker thread so the Tk main loop keeps repainting.
+    Results are handed back on the Tk thread by polling a queue with after()."""
+    def __init__(self, schedule, poll_ms=WORKER_POLL_MS):
+        """A method that initializes instance variables and starts the worker thread.
+        'schedule' is a Tk style after(ms, func) function."""
+        self._schedule = schedule
+        self._poll_ms = poll_ms
+        self._tasks = queue.Queue()
+        self._results = queue.Queue()
+        self._generation = 0  # bumped by cancel_pending, older tasks and results are dropped
+        self._stopped = False  # set by stop, ends the polling
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        self._schedule(self._poll_ms, self._poll)
+
+    def submit(self, func, callback, errback=None):
+        """A method that runs func() on the worker thread and later calls callback(result) on the Tk thread.
+        If func() raises, errback(error) is called on the Tk thread instead, if it is given."""
+        self._tasks.put((self._generation, func, callback, errback))
+
+    def cancel_pending(self):
+        """A method that drops every task that hasn't run yet and every result that hasn't been delivered."""
+        self._generation += 1
+
+    def stop(self):
+        """A method that cancels pending work, ends the worker thread and stops polling for results."""
+        self.cancel_pending()
+        self._stopped = True
+        self._tasks.put(None)
+
+    def _run(self):
+        """A helper method that runs tasks on the worker thread until stopped."""
+        while True:
+            task = self._tasks.get()
+            if task is None:
+                return
+            generation, func, callback, errback = task
+            if generation != self._generation:
+                continue
+            try:
+                result = func()
+            except Exception as error:
+                traceback.print_exc()
+                if errback is not None:
+                    self._results.put((generation, errback, error))
+                continue
+            self._results.put((generation, callback, result))
+
+    def _poll(self):
+        """A helper method that delivers finished results on the Tk thread and polls again, until stopped."""
+        if self._stopped:
+            return
+        while True:
+            try:
+                generation, callback, result = self._results.get_nowait()
+            except queue.Empty:
+                break
+            if generation == self._generation:
+                callback(result)
+        self._schedule(self._poll_ms, self._poll)
 
 
 class BoggleGui:
     """Graphic class of Boggle! Deals with front end design."""
-    _dice_number_to_object = {}
-    _dice_letter_to_image = {}
-
-    def __init__(self):
-        """A method that initializes instance variables."""
+    def __init__(self, board_size=BOARD_SIZE, language=ENGLISH):
+        """A method that initializes instance variables. The board size and language are kept for the next game."""
+        self._board_size = board_size
+        self._language = language
         root = tk.Tk()
         root.title("Boggle!")
         root.resizable(False, False)
@@ -160,19 +343,19 @@ class BoggleGui:
         self.board_frame = tk.Frame(self.__main_window, width=400, height=400,
                                     background="#ffffff", highlightthickness=50)
         # dice grid
-        for i in range(4):
+        for i in range(board_size):
             tk.Grid.columnconfigure(self.board_frame, i, weight=1)
             tk.Grid.rowconfigure(self.board_frame, i, weight=1)
 
-        # dice images
-        for i in range(26):
-            self._dice_letter_to_image[str(chr(ord('A') + i))] = \
-                ImageTk.PhotoImage(Image.open(f"dice_{chr(ord('a') + i)}.png"))
-        self.blank_dice = ImageTk.PhotoImage(Image.open("dice_blank.png"))
+        # dice images, letters are loaded when a board first shows them
+        self._dice_letter_to_image = {}  # per window, images don't outlive the Tk root that made them
+        self.blank_dice = self._load_image("dice_blank.png")
+        self._dice_number_to_object = {}  # per window too, filled when the board is made
+        self._die_color = None  # a die's own colour, read from the first die made; None leaves the colour as it is
 
         # make pre-game board
-        for i in range(4):
-            for j in range(4):
+        for i in range(board_size):
+            for j in range(board_size):
                 die_label = tk.Label(self.board_frame, image=self.blank_dice)
                 die_label.grid(row=i, column=j, rowspan=1, columnspan=1, padx=1, pady=7)
 
@@ -202,22 +385,63 @@ class BoggleGui:
 
         self.__main_window.grid_rowconfigure(1, weight=1)
         self.__main_window.grid_columnconfigure(1, weight=1)
+        self._deadline = None
+        self._close_command = lambda: None
+        self.__main_window.protocol("WM_DELETE_WINDOW", self._on_close)
 
     def create_board(self, board):
         """A method that creates the game board. Initialized when newgame button is pressed."""
-        for i in range(4):
-            for j in range(4):
+        for i in range(len(board)):
+            for j in range(len(board[i])):
                 letter = board[i][j]
-                if letter == 'QU': letter = 'Q'
-                self._make_dice_button(self._dice_letter_to_image[letter], i, j, dice_number=i * 4 + j)
-
-    def _make_dice_button(self, button_img, row, col, dice_number, rowspan=1, columnspan=1):
-        """A helper method that initializes each dice button. Dictionary that ties dice number to object is updated."""
-        die_button = tk.Button(self.board_frame, image=button_img, **BUTTON_STYLE)
+                self._make_dice_button(self._get_dice_image(letter), i, j, dice_number=i * len(board[i]) + j,
+                                       letter=letter)
+
+    def _get_dice_image(self, letter):
+        """A helper method that returns the image of a letter's die, loading it the first time it is shown.
+        Returns None for a letter that has no image (like the letters of other alphabets)."""
+        if letter not in self._dice_letter_to_image:
+            name = DIE_IMAGE_NAMES.get(letter, letter.lower())
+            file_path = f"dice_{name}.png"
+            image = None
+            if name.isascii() and os.path.exists(file_path):
+                image = self._load_image(file_path)
+            self._dice_letter_to_image[letter] = image
+        return self._dice_letter_to_image[letter]
+
+    def _load_image(self, file_path):
+        """A helper method that loads an image. Tk reads PNG files itself, so PIL is only imported as a fallback."""
+        try:
+            return tk.PhotoImage(file=file_path)
+        except tk.TclError:
+            from PIL import Image, ImageTk
+            return ImageTk.PhotoImage(Image.open(file_path))
+
+    def _make_dice_button(self, button_img, row, col, dice_number, rowspan=1, columnspan=1, letter=""):
+        """A helper method that initializes each dice button. Dictionary that ties dice number to object is updated.
+        A die with no image shows its letter as text on a blank die."""
+        if button_img is None:
+            die_button = tk.Button(self.board_frame, image=self.blank_dice, text=letter, compound=tk.CENTER,
+                                   font=DIE_FONT, **BUTTON_STYLE)
+        else:
+            die_button = tk.Button(self.board_frame, image=button_img, **BUTTON_STYLE)
+        self._die_color = die_button.cget("bg")
         die_button.grid(row=row, column=col, rowspan=rowspan, columnspan=columnspan, padx=1, pady=7)
         self._dice_number_to_object[dice_number] = die_button
         return die_button
 
+    def highlight_dice(self, legal_dice=(), chosen_dice=(), dead_end=False):
+        """A method that colours the dice of the current path and the dice that may be pressed next (by dice number),
+        and shows the word in red when no word starts with it. Called with no arguments it clears the highlights."""
+        for dice_number, die_button in self._dice_number_to_object.items():
+            if dice_number in chosen_dice:
+                die_button.configure(bg=CHOSEN_DIE_COLOR, relief=tk.SUNKEN)
+            elif dice_number in legal_dice:
+                die_button.configure(bg=LEGAL_DIE_COLOR, relief=tk.RIDGE)
+            else:
+                die_button.configure(bg=self._die_color, relief=tk.FLAT)
+        self.submit_label.configure(fg=DEAD_END_COLOR if dead_end else "black")
+
     def get_dice_dict(self):
         """A getter method for the 'dice number to object' dictionary."""
         return self._dice_number_to_object
@@ -251,45 +475,111 @@ class BoggleGui:
         self.points["text"] = f"Points: {points}"
         self.message_display["text"] = f"{message}"
 
-    def countdown_timer(self, count):
-        """A method responsible for creating the countdown timer."""
-        time_display = time.strftime("%M:%S", time.gmtime(count))
+    def countdown_timer(self, seconds):
+        """A method responsible for creating the countdown timer. The timer counts down to a monotonic deadline,
+        so late or bunched up after() callbacks never make it drift."""
+        self._deadline = time.monotonic() + seconds
+        self._tick()
+
+    def _tick(self):
+        """A helper method that shows the time left and schedules the next tick for the next whole second."""
+        remaining = max(self._deadline - time.monotonic(), 0)
+        time_display = time.strftime("%M:%S", time.gmtime(math.ceil(remaining)))
         self.timer.configure(text=f"Timer: {time_display}")
-        self._has_timer_ended(count)
+        self._has_timer_ended(remaining)
 
-    def _has_timer_ended(self, count):
+    def _has_timer_ended(self, remaining):
         """A helper method that checks if timer has ended and if it has, executes the endgame screen."""
-        if count > 0:
-            self.__main_window.after(1000, self.countdown_timer, count - 1)
+        if remaining > 0:
+            self.__main_window.after(math.ceil(remaining % 1 * 1000) or 1000, self._tick)
         else:
             answer = messagebox.askyesno("Game Over", "    Your time has run out \nDo you want to play again?")
+            self._close_command()
             if answer:
                 self.__main_window.destroy()
-                main()
+                main(self._board_size, self._language)
             else:
                 sys.exit()
 
+    def after(self, ms, func, *args):
+        """A method that schedules func(*args) on the Tk main loop after 'ms' milliseconds."""
+        return self.__main_window.after(ms, func, *args)
+
+    def set_close_command(self, cmd):
+        """A method that sets the command run when the game window is about to close: at the end of the game or
+        when the window is closed mid-game. Used by controller."""
+        self._close_command = cmd
+
+    def _on_close(self):
+        """A helper method that is called when the player closes the window. The game ends before it closes."""
+        self._close_command()
+        self.__main_window.destroy()
+
+    def set_thinking(self, thinking):
+        """A method that shows (or clears) the 'thinking' state of the hint button while a hint is computed."""
+        self.hint["text"] = "..." if thinking else "Hint"
+        if thinking:
+            self.message_display["text"] = "Thinking..."
+
     def run(self):
         """A method that runs the game's mainloop."""
+        if os.environ.get(FIRST_PAINT_ENV):
+            self.__main_window.after_idle(self._report_first_paint)
         self.__main_window.mainloop()
 
+    def _report_first_paint(self):
+        """A helper method that prints how long the window took to paint since launch, then quits."""
+        self.__main_window.update()
+        print(f"first paint: {(time.perf_counter() - _LAUNCHED) * 1000:.1f} ms", flush=True)
+        self.__main_window.destroy()
+
 
 class BoggleController:
     """Controller class that bridges the gap between back-end and front-end."""
-    def __init__(self):
-        """A method that initializes instance variables."""
-        self._gui = BoggleGui()
-        self._model = BoggleModel()
+    def __init__(self, board_size=BOARD_SIZE, language=ENGLISH):
+        """A method that initializes instance variables. The game is played with the language's dictionary and
+        dice (see boggle_languages)."""
+        self._gui = BoggleGui(board_size, language)
+        pooled_board = self._take_pooled_board() if board_size == BOARD_SIZE and language is ENGLISH else None
+        self._model = BoggleModel(pooled_board, board_size, language=language)
+        self._worker = BackgroundWorker(self._gui.after)
         self._gui.set_newgame_button_command(lambda: self.start_new_game(self._model.get_board()))
         self._gui.set_submit_button_command(self.set_display)
         self._gui.set_hint_button_command(self.hint_is_pressed)
+        self._gui.set_close_command(self._end_game)
+        self._game_log = None
+        self._stop_profile = None  # stops the BOGGLE_PROFILE profile of the running game, see boggle_metrics
         self.newgame_wasnt_pressed = True
+        self._hint_pending = False
+        self._solve_board()
+
+    def _solve_board(self):
+        """A helper method that solves the board on the background worker."""
+        self._solving = True
+        self._worker.submit(self._model.solve, self._board_is_solved, self._solve_failed)
+
+    def _take_pooled_board(self):
+        """A helper method that takes a ready board from the board pool, if there is one (see boggle_board_pool),
+        and tops the pool up in the background, even when it was empty. Returns None if no pool is set up or it
+        had no board. Pooled boards are English and BOARD_SIZE x BOARD_SIZE."""
+        if not os.path.exists(BOARD_POOL_PATH):
+            return None
+        from boggle_board_pool import BoardPool
+        pool = BoardPool(BOARD_POOL_PATH)
+        board = pool.take()
+        pool.start_refill(BOARD_POOL_SIZE)
+        return board
 
     def start_new_game(self, board):
         """A method that is called when the new_game button is pressed.
         (1) Board with letters is created and displayed, (2) Buttons are bound to the the dice is pressed method and
         (3) Button is deactivated and disappears."""
         if self.newgame_wasnt_pressed:
+            from boggle_replay import GameLog  # imported here to keep it off the path to the first paint
+            self._game_log = GameLog(GAME_LOG_PATH)
+            self._model.set_game_log(self._game_log)
+            self._model.start_game()
+            self._stop_profile = boggle_metrics.start_profile_from_env()
             self._gui.create_board(board)
             self._gui.countdown_timer(TIMER_SECONDS)
             self.set_dice_command()
@@ -304,47 +594,100 @@ class BoggleController:
     def set_display(self):
         """A method that is called when the submit button is pressed.
         (1) Submit function in Model class is called and (2) guessed words, points and message data are collected
-        and displayed."""
+        and displayed. A path too short to submit is kept, so its letters and highlights stay on the board."""
         self._model.submit_is_pressed()
         guessed_words = self._model.get_guessed_words()
         points = self._model.points
         message = self._model.message
         self._gui.get_display(guessed_words, points, message)
+        if self._model.get_path():
+            return
         self._gui.submit_label["text"] = ""
+        self._gui.highlight_dice()
 
     def dice_is_pressed(self, dice_number):
         """A method that is called when a dice button is pressed.
-        (1) Dice coordinates are found, (2) Dice letter is displayed and (3) Path is built."""
-        x = dice_number//4
-        y = dice_number%4
-        letter = self._model.get_board()[x][y]
-        self._gui.submit_label["text"] += letter
-        letter_coord = [(x, y)]
-        path = self._model.get_path()
-        path += letter_coord
-        return self._model.set_path(path)
+        (1) Dice coordinates are found, (2) Path is built if the die may be chosen, (3) Dice letter is displayed and
+        (4) the path and the dice that may be pressed next are highlighted."""
+        cols = len(self._model.get_board()[0])
+        x, y = divmod(dice_number, cols)
+        if not self._model.press_die(x, y):
+            self._gui.message_display["text"] = "Choose an unused die next to the last one"
+            return
+        self._gui.submit_label["text"] += self._model.get_board()[x][y]
+        legal_dice = {row * cols + col for row, col in self._model.get_legal_moves()}
+        chosen_dice = {row * cols + col for row, col in self._model.get_path()}
+        self._gui.highlight_dice(legal_dice, chosen_dice, dead_end=not self._model.path_is_prefix())
 
     def hint_is_pressed(self):
-        """A method that is called when the hint button is pressed.
+        """A method that is called when the hint button is pressed. If the board is still being solved in the
+        background, a 'thinking' state is shown and the hint is given once the solve is done.
+        Presses before the new_game button are ignored: a hint costs points, and the game log only starts with the
+        game."""
+        if self.newgame_wasnt_pressed:
+            return
+        if self._model.is_solved():
+            self._show_hint()
+        elif not self._hint_pending:
+            self._hint_pending = True
+            self._gui.set_thinking(True)
+            if not self._solving:
+                self._solve_board()  # the last solve failed, try again
+
+    def _board_is_solved(self, solutions):
+        """A helper method that is called on the Tk thread when the background solve of the board is done."""
+        self._solving = False
+        self._model.set_solutions(solutions)
+        if self._hint_pending:
+            self._hint_pending = False
+            self._gui.set_thinking(False)
+            self._show_hint()
+
+    def _solve_failed(self, error):
+        """A helper method that is called on the Tk thread when the background solve of the board failed.
+        A waiting hint is cancelled; the next hint press solves the board again."""
+        self._solving = False
+        if self._hint_pending:
+            self._hint_pending = False
+            self._gui.set_thinking(False)
+            self._gui.message_display["text"] = "Couldn't find a hint, try again"
+
+    def _show_hint(self):
+        """A helper method that gives a hint.
         (1) Hint is displayed in message box. (2) 30-point deduction is displayed."""
-        message = self._model.get_hint()
+        message = self._model.take_hint()
+        if message is None:
+            message = "There are no words left to find"
         guessed_words = self._model.get_guessed_words()
-        self._model.points -= 30
         self._gui.get_display(guessed_words, self._model.points, message)
 
+    def _end_game(self):
+        """A helper method that is called when the game is over, or its window is closed: the background worker is
+        stopped and the game's result is written to the game log, by the first call only."""
+        self._worker.stop()
+        if self._game_log is not None:
+            self._model.end_game()
+            self._game_log.close()
+            self._game_log = None
+        if self._stop_profile is not None:
+            self._stop_profile()
+            self._stop_profile = None
+
     def run(self):
         """A method that calls the run method of the Gui."""
         self._gui.run()
 
 
-def main():
-    """A function that creates a controller and runs the game."""
-    game = BoggleController()
+def main(board_size=BOARD_SIZE, language=ENGLISH):
+    """A function that creates a controller and runs the game on a board_size x board_size board in a language."""
+    game = BoggleController(board_size, language)
     game.run()
 
 
 if __name__ == '__main__':
-    main()
+    # python boggle.py [board size] [language name or JSON file, see boggle_languages]
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else BOARD_SIZE,
+         get_language(sys.argv[2]) if len(sys.argv) > 2 else ENGLISH)
 
 
 
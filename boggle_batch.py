@@ -0,0 +1,101 @@
+"""Headless batch solver: solves many boards across a process pool and streams one JSON line per board.
+
+Examples:
+    python boggle_batch.py --boards 1000 --seed 7 > boards.jsonl
+    python boggle_batch.py --input boards.txt --workers 8
+"""
+import argparse
+import json
+import multiprocessing
+import random
+import sys
+import time
+from boggle_utils import *
+from boggle_languages import ENGLISH
+
+DEFAULT_DICT = ENGLISH.dict_path
+DEFAULT_CHUNKSIZE = 64
+
+_worker_words = None  # the dictionary of a worker process, loaded once by _init_worker
+
+
+def generate_boards(count, seed, board_size=BOARD_SIZE):
+    """A function that lazily generates 'count' random boards of board_size x board_size.
+    The same seed always gives the same boards."""
+    dice_list = get_dice_set(board_size)
+    rng = random.Random(seed)
+    for _ in range(count):
+        yield randomize_board(dice_list, board_size, rng)
+
+
+def read_boards(file_path):
+    """A function that lazily reads boards from a file. Each line is one board, either as a JSON list of rows or as
+    its dice separated by whitespace, row by row (e.g. 16 dice for a 4x4 board)."""
+    with open(file_path) as data_file:
+        for line in data_file:
+            line = line.strip()
+            if not line:
+                continue
+            if line.startswith("["):
+                yield json.loads(line)
+                continue
+            dice = line.upper().split()
+            size = int(round(len(dice) ** 0.5))
+            if size * size != len(dice):
+                raise ValueError(f"a board needs a square number of dice, got {len(dice)}: {line}")
+            yield [dice[i:i + size] for i in range(0, len(dice), size)]
+
+
+def _init_worker(dict_path):
+    """A helper function that loads the dictionary once per worker process."""
+    global _worker_words
+    _worker_words = get_words_index(dict_path)
+
+
+def _solve_numbered_board(numbered_board):
+    """A helper function that solves one (number, board) pair inside a worker process."""
+    number, board = numbered_board
+    result = {"index": number, "board": board}
+    start = time.perf_counter()
+    result.update(get_board_stats(board, _worker_words))
+    result["solve_ms"] = round((time.perf_counter() - start) * 1000, 3)
+    return result
+
+
+def solve_boards(boards, dict_path=DEFAULT_DICT, workers=None, chunksize=DEFAULT_CHUNKSIZE):
+    """A function that solves an iterable of boards across a process pool and yields one result dictionary per board,
+    in the input order. With workers=1 the boards are solved in this process."""
+    numbered_boards = enumerate(boards)
+    if workers == 1:
+        _init_worker(dict_path)
+        yield from map(_solve_numbered_board, numbered_boards)
+        return
+    with multiprocessing.Pool(workers, initializer=_init_worker, initargs=(dict_path,)) as pool:
+        yield from pool.imap(_solve_numbered_board, numbered_boards, chunksize)
+
+
+def main(argv=None):
+    """A function that parses the command line, solves the boards and writes JSON lines to stdout."""
+    parser = argparse.ArgumentParser(description="Solve many Boggle boards and print their statistics as JSON lines.")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--boards", type=int, help="number of random boards to generate")
+    source.add_argument("--input", help="file with one board per line")
+    parser.add_argument("--seed", type=int, default=0, help="seed for generated boards (default 0)")
+    parser.add_argument("--size", type=int, default=BOARD_SIZE, help=f"generated board size (default {BOARD_SIZE})")
+    parser.add_argument("--dict", default=DEFAULT_DICT, help=f"word file (default {DEFAULT_DICT})")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: one per core)")
+    parser.add_argument("--chunksize", type=int, default=DEFAULT_CHUNKSIZE, help="boards sent to a worker at a time")
+    args = parser.parse_args(argv)
+
+    if args.input:
+        boards = read_boards(args.input)
+    else:
+        boards = generate_boards(args.boards, args.seed, args.size)
+    out = sys.stdout
+    for result in solve_boards(boards, args.dict, args.workers, args.chunksize):
+        out.write(json.dumps(result, separators=(",", ":")) + "\n")
+    out.flush()
+
+
+if __name__ == '__main__':
+    main()
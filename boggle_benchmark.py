@@ -0,0 +1,254 @@
+"""Benchmarks for the dictionary load, solver, hint and submit hot paths.
+
+Examples:
+    python boggle_benchmark.py --save baseline.json
+    python boggle_benchmark.py --compare baseline.json     # exits with status 1 on a regression
+Cases on pathological boards also fail when they run above a fixed time ceiling, with or without a baseline.
+"""
+import argparse
+import importlib.util
+import json
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+from boggle_utils import *
+from boggle_languages import ENGLISH
+
+DICT_PATH = ENGLISH.dict_path
+BENCH_SEED = 2024
+DEFAULT_REPEAT = 20
+DEFAULT_TOLERANCE = 0.25  # allowed slowdown of the median before a case counts as a regression
+MIN_SLACK_MS = 0.05  # differences below this are timer noise
+# Boards full of repeated letters, where a search without pruning explodes, and the time no run may ever exceed.
+PATHOLOGICAL_BOARDS = {
+    "all_e": [["E"] * 4 for _ in range(4)],
+    "e_s": [["E", "S", "E", "S"], ["S", "E", "S", "E"], ["E", "S", "E", "S"], ["S", "E", "S", "E"]],
+    "e_r_s": [["E", "R", "E", "S"], ["S", "E", "R", "E"], ["E", "S", "E", "R"], ["R", "E", "S", "E"]],
+    "dense": [["S", "E", "R", "S"], ["P", "A", "T", "G"], ["L", "I", "N", "E"], ["S", "E", "R", "S"]],
+}
+CEILINGS_MS = {"find_length_n_words[pathological": 250, "find_word_path[pathological": 50}
+SNAKE_PATH = [(0, 0), (0, 1), (0, 2), (0, 3), (1, 3), (1, 2), (1, 1), (1, 0),
+              (2, 0), (2, 1), (2, 2), (2, 3), (3, 3), (3, 2), (3, 1), (3, 0)]
+
+
+def _fixed_board():
+    """A helper function that returns the same random board on every run."""
+    return randomize_board(LETTERS, BOARD_SIZE, random.Random(BENCH_SEED))
+
+
+def _case_load_words_dict():
+    return lambda: load_words_dict(DICT_PATH)
+
+
+def _case_load_words_index():
+    def load():
+        invalidate_dictionary_cache(DICT_PATH)
+        return get_words_index(DICT_PATH)
+    return load
+
+
+def _case_find_length_n_words(n):
+    def setup():
+        board = _fixed_board()
+        words = get_words_index(DICT_PATH)
+        return lambda: find_length_n_words(n, board, words)
+    return setup
+
+
+def _case_pathological_words(board):
+    def setup():
+        words = get_words_index(DICT_PATH)
+        return lambda: [find_length_n_words(n, board, words) for n in (5, 10, 16)]
+    return setup
+
+
+def _case_pathological_word_path(board, word):
+    return lambda: lambda: find_word_path(board, word)
+
+
+def _case_get_hint(first):
+    def setup():
+        from boggle import BoggleModel
+        get_words_index(DICT_PATH)  # the dictionary is shared, keep its load out of the timing
+        model = BoggleModel(rng=random.Random(BENCH_SEED))
+        if first:
+            def hint():
+                model._unfound_words = None
+                return model.get_hint()
+            return hint
+        model.get_hint()
+        return model.get_hint
+    return setup
+
+
+def _case_is_valid_path(path):
+    def setup():
+        board = _fixed_board()
+        words = get_words_index(DICT_PATH)
+        return lambda: is_valid_path(board, path, words)
+    return setup
+
+
+def _case_solve_board_size(board_size, count=10):
+    def setup():
+        rng = random.Random(BENCH_SEED)
+        boards = [randomize_board(get_dice_set(board_size), board_size, rng) for _ in range(count)]
+        words = get_words_index(DICT_PATH)
+        return lambda: [solve_board(board, words) for board in boards]
+    return setup
+
+
+def _case_solve_boards_batch(board_size, count=10):
+    def setup():
+        rng = random.Random(BENCH_SEED)
+        boards = [randomize_board(get_dice_set(board_size), board_size, rng) for _ in range(count)]
+        words = get_words_index(DICT_PATH)
+        solve_boards_batch(boards[:1], words)  # builds the dictionary's letter counts once, outside the timing
+        return lambda: solve_boards_batch(boards, words)
+    return setup
+
+
+def _case_best_word(count=10):
+    def setup():
+        from boggle_letter_index import get_letter_index
+        rng = random.Random(BENCH_SEED)
+        boards = [randomize_board(LETTERS, BOARD_SIZE, rng) for _ in range(count)]
+        index = get_letter_index(DICT_PATH)
+        return lambda: [index.best_word(board) for board in boards]
+    return setup
+
+
+def _case_randomize_board(count=1000):
+    def setup():
+        rng = random.Random(BENCH_SEED)
+        return lambda: [randomize_board(LETTERS, BOARD_SIZE, rng) for _ in range(count)]
+    return setup
+
+
+def _case_board_from_seed(count=1000):
+    def setup():
+        rng = random.Random()
+        return lambda: [board_from_seed(seed, BOARD_SIZE, None, rng) for seed in range(BENCH_SEED, BENCH_SEED + count)]
+    return setup
+
+
+def get_cases():
+    """A function that returns the benchmark cases as (name, setup) pairs. A setup returns the callable to time."""
+    cases = [("load_words_dict", _case_load_words_dict),
+             ("load_words_index", _case_load_words_index)]
+    for n in range(3, 17):
+        cases.append((f"find_length_n_words[{n}]", _case_find_length_n_words(n)))
+    for name, board in PATHOLOGICAL_BOARDS.items():
+        cases.append((f"find_length_n_words[pathological:{name}]", _case_pathological_words(board)))
+    one_s_board = [["E"] * 4 for _ in range(4)]
+    one_s_board[0][0] = "S"
+    cases += [("find_word_path[pathological:hamiltonian]", _case_pathological_word_path(one_s_board, "E" * 15 + "S")),
+              ("find_word_path[pathological:missing]", _case_pathological_word_path(one_s_board, "E" * 16))]
+    cases += [("get_hint[first]", _case_get_hint(first=True)),
+              ("get_hint[cached]", _case_get_hint(first=False)),
+              ("is_valid_path[long]", _case_is_valid_path(SNAKE_PATH)),
+              ("is_valid_path[invalid]", _case_is_valid_path(SNAKE_PATH[:8] + [(0, 0)] + SNAKE_PATH[8:])),
+              ("randomize_board[x1000]", _case_randomize_board()),
+              ("board_from_seed[x1000]", _case_board_from_seed()),
+              ("best_word[x10]", _case_best_word())]
+    for board_size in sorted(DICE_SETS):
+        cases.append((f"solve_board[{board_size}x{board_size},x10]", _case_solve_board_size(board_size)))
+    if importlib.util.find_spec("numpy") is not None:
+        for board_size in sorted(DICE_SETS):
+            cases.append((f"solve_boards_batch[{board_size}x{board_size},x10]", _case_solve_boards_batch(board_size)))
+    return cases
+
+
+def run_case(setup, repeat):
+    """A function that times a case 'repeat' times and measures its peak traced memory in one extra run.
+    Returns the median and 95th percentile in milliseconds and the peak memory in KiB."""
+    func = setup()
+    func()  # warm up
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - start) * 1000)
+    tracemalloc.start()
+    try:
+        func()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    timings.sort()
+    p95 = timings[min(len(timings) - 1, int(round(0.95 * (len(timings) - 1))))]
+    return {"median_ms": round(statistics.median(timings), 4),
+            "p95_ms": round(p95, 4),
+            "peak_kib": round(peak / 1024, 1)}
+
+
+def run_benchmarks(repeat=DEFAULT_REPEAT, only=None):
+    """A function that runs every case (or the cases whose name contains one of 'only') and returns the results."""
+    results = {}
+    for name, setup in get_cases():
+        if only and not any(part in name for part in only):
+            continue
+        results[name] = run_case(setup, repeat)
+        _print_row(name, results[name])
+    return results
+
+
+def find_ceiling_breaches(results):
+    """A function that returns a message for every case whose 95th percentile is above its time ceiling."""
+    breaches = []
+    for name, result in results.items():
+        for prefix, ceiling in CEILINGS_MS.items():
+            if name.startswith(prefix) and result["p95_ms"] > ceiling:
+                breaches.append(f"{name}: p95 {result['p95_ms']:.4f} ms is above the {ceiling} ms ceiling")
+    return breaches
+
+
+def find_regressions(results, baseline, tolerance=DEFAULT_TOLERANCE):
+    """A function that returns a message for every case whose median is slower than its baseline by more than
+    'tolerance' (a fraction). Cases missing from either side are ignored."""
+    regressions = []
+    for name, result in results.items():
+        if name not in baseline:
+            continue
+        old, new = baseline[name]["median_ms"], result["median_ms"]
+        if new > old * (1 + tolerance) and new - old > MIN_SLACK_MS:
+            regressions.append(f"{name}: median {old:.4f} ms -> {new:.4f} ms ({new / old - 1:+.0%})")
+    return regressions
+
+
+def _print_row(name, result):
+    """A helper function that prints one result line."""
+    print(f"{name:<44}{result['median_ms']:>12.4f} ms{result['p95_ms']:>12.4f} ms{result['peak_kib']:>12.1f} KiB",
+          flush=True)
+
+
+def main(argv=None):
+    """A function that parses the command line, runs the benchmarks and saves or compares the results."""
+    parser = argparse.ArgumentParser(description="Benchmark the Boggle hot paths.")
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT, help="timed runs per case")
+    parser.add_argument("--only", nargs="*", help="run only cases whose name contains one of these")
+    parser.add_argument("--save", help="write the results to this JSON file")
+    parser.add_argument("--compare", help="baseline JSON file to compare against")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE, help="allowed median slowdown")
+    args = parser.parse_args(argv)
+
+    print(f"{'case':<44}{'median':>15}{'p95':>15}{'peak memory':>16}")
+    results = run_benchmarks(args.repeat, args.only)
+    if args.save:
+        with open(args.save, "w") as out_file:
+            json.dump(results, out_file, indent=2)
+    failures = find_ceiling_breaches(results)
+    if args.compare:
+        with open(args.compare) as baseline_file:
+            failures += find_regressions(results, json.load(baseline_file), args.tolerance)
+    if failures:
+        print("\nREGRESSIONS:\n" + "\n".join(failures))
+        return 1
+    print("\nNo regressions.")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,191 @@
+"""Difficulty banded board generation and an on-disk pool of ready boards.
+
+Examples:
+    python boggle_board_pool.py --fill 500                        # top up boards_pool.jsonl to 500 boards
+    python boggle_board_pool.py --fill 200 --min-words 150 --min-longest 8 --pool hard_pool.jsonl
+"""
+import argparse
+import contextlib
+import json
+import os
+import random
+import sys
+import threading
+from boggle_utils import *
+from boggle_batch import DEFAULT_DICT, generate_boards, solve_boards
+
+DEFAULT_POOL = "boards_pool.jsonl"
+LOCK_SUFFIX = ".lock"  # the pool file's lock file, which other processes lock too
+# Inclusive (low, high) bounds on the statistics of get_board_stats; 'longest' bounds the length of the longest word.
+DEFAULT_BAND = {"words": (80, 250), "max_score": (1000, 5000), "longest": (6, 16)}
+MAX_TRIES = 10000
+FILL_BATCH = 256
+
+_pool_locks = {}  # absolute pool file path -> the thread lock every BoardPool of that file shares
+_refill_threads = {}  # absolute pool file path -> its running refill thread, see BoardPool.start_refill
+_pools_lock = threading.Lock()
+
+
+def is_in_band(stats, band=DEFAULT_BAND):
+    """A function that checks if a board's statistics (see get_board_stats) fall in a difficulty band."""
+    for name, (low, high) in band.items():
+        value = stats[name]
+        if name == "longest":
+            value = len(value)
+        if not low <= value <= high:
+            return False
+    return True
+
+
+def generate_board_in_band(words, band=DEFAULT_BAND, board_size=BOARD_SIZE, max_tries=MAX_TRIES):
+    """A function that draws random boards until one falls in the difficulty band (rejection sampling).
+    Returns the board and its statistics. Raises RuntimeError if no board is accepted within 'max_tries' draws."""
+    dice_list = get_dice_set(board_size)
+    for _ in range(max_tries):
+        board = randomize_board(dice_list, board_size)
+        stats = get_board_stats(board, words)
+        if is_in_band(stats, band):
+            return board, stats
+    raise RuntimeError(f"no board in {band} after {max_tries} tries")
+
+
+class BoardPool:
+    """A JSON lines file of pre-generated boards in a difficulty band, so a game can start without waiting.
+    Each line holds a board and its statistics. All file access is guarded by one thread lock per pool file,
+    shared by every BoardPool of that file, and by an OS lock on the pool's lock file, so the pool can be topped
+    up by a background thread or another process (like this module's --fill) while games take boards from it."""
+    def __init__(self, file_path=DEFAULT_POOL, band=DEFAULT_BAND, dict_path=DEFAULT_DICT):
+        """A method that initializes instance variables."""
+        self._file_path = file_path
+        self._band = band
+        self._dict_path = dict_path
+        self._path_key = os.path.abspath(file_path)
+        with _pools_lock:
+            self._lock = _pool_locks.setdefault(self._path_key, threading.Lock())
+
+    def __len__(self):
+        with self._locked():
+            return len(self._read_entries())
+
+    def take(self):
+        """A method that removes the oldest board from the pool and returns it, or None if the pool is empty."""
+        with self._locked():
+            entries = self._read_entries()
+            if not entries:
+                return None
+            self._write_entries(entries[1:])
+            return entries[0]["board"]
+
+    def add(self, board, stats):
+        """A method that appends a board and its statistics to the pool."""
+        entry = dict(stats, board=board)
+        with self._locked():
+            with open(self._file_path, "a") as pool_file:
+                pool_file.write(json.dumps(entry, separators=(",", ":")) + "\n")
+
+    def fill(self, target, workers=None, seed=None, max_tries=MAX_TRIES):
+        """A method that generates boards until the pool holds 'target' of them. Candidates are solved in batches
+        across a process pool (see boggle_batch.solve_boards) and only boards in the band are kept.
+        Gives up once 'max_tries' candidates in a row fall outside the band. Returns the number of boards added."""
+        added = 0
+        misses = 0
+        size = len(self)
+        seed = random.randrange(2 ** 32) if seed is None else seed
+        while size < target and misses < max_tries:
+            for result in solve_boards(generate_boards(FILL_BATCH, seed), self._dict_path, workers):
+                if is_in_band(result, self._band):
+                    self.add(result["board"], {name: result[name] for name in DEFAULT_BAND})
+                    added += 1
+                    size += 1
+                    misses = 0
+                else:
+                    misses += 1
+                if size >= target or misses >= max_tries:
+                    break
+            seed += 1
+        return added
+
+    def start_refill(self, target):
+        """A method that tops the pool up to 'target' boards on a background thread and returns the thread.
+        If the pool file is already being topped up in this process, that thread is returned instead."""
+        with _pools_lock:
+            thread = _refill_threads.get(self._path_key)
+            if thread is None or not thread.is_alive():
+                thread = _refill_threads[self._path_key] = threading.Thread(target=self.fill, args=(target, 1),
+                                                                            daemon=True)
+                thread.start()
+        return thread
+
+    @contextlib.contextmanager
+    def _locked(self):
+        """A helper method that holds the pool's thread lock and then its OS file lock."""
+        with self._lock, _lock_file(self._file_path + LOCK_SUFFIX):
+            yield
+
+    def _read_entries(self):
+        """A helper method that reads every pool entry. A missing pool file is an empty pool."""
+        if not os.path.exists(self._file_path):
+            return []
+        with open(self._file_path) as pool_file:
+            return [json.loads(line) for line in pool_file if line.strip()]
+
+    def _write_entries(self, entries):
+        """A helper method that replaces the pool file with 'entries' in one atomic rename."""
+        temp_path = self._file_path + ".tmp"
+        with open(temp_path, "w") as pool_file:
+            for entry in entries:
+                pool_file.write(json.dumps(entry, separators=(",", ":")) + "\n")
+        os.replace(temp_path, self._file_path)
+
+
+@contextlib.contextmanager
+def _lock_file(lock_path):
+    """A helper context manager that holds an exclusive OS lock on a file (created if needed) while its body runs."""
+    with open(lock_path, "a+b") as lock_file:
+        if os.name == "nt":
+            import msvcrt
+            lock_file.seek(0)
+            while True:
+                try:
+                    msvcrt.locking(lock_file.fileno(), msvcrt.LK_LOCK, 1)
+                    break
+                except OSError:
+                    pass  # LK_LOCK gives up after about 10 seconds, keep waiting
+            try:
+                yield
+            finally:
+                lock_file.seek(0)
+                msvcrt.locking(lock_file.fileno(), msvcrt.LK_UNLCK, 1)
+        else:
+            import fcntl
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+
+
+def main(argv=None):
+    """A function that parses the command line and fills a board pool."""
+    parser = argparse.ArgumentParser(description="Pre-generate Boggle boards in a difficulty band.")
+    parser.add_argument("--fill", type=int, required=True, help="number of boards the pool should hold")
+    parser.add_argument("--pool", default=DEFAULT_POOL, help=f"pool file (default {DEFAULT_POOL})")
+    parser.add_argument("--dict", default=DEFAULT_DICT, help=f"word file (default {DEFAULT_DICT})")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: one per core)")
+    parser.add_argument("--seed", type=int, default=None, help="seed for the candidate boards")
+    for name, (low, high) in DEFAULT_BAND.items():
+        parser.add_argument(f"--min-{name.replace('_', '-')}", type=int, default=low)
+        parser.add_argument(f"--max-{name.replace('_', '-')}", type=int, default=high)
+    args = parser.parse_args(argv)
+
+    band = {name: (getattr(args, f"min_{name}"), getattr(args, f"max_{name}")) for name in DEFAULT_BAND}
+    pool = BoardPool(args.pool, band, args.dict)
+    added = pool.fill(args.fill, args.workers, args.seed)
+    size = len(pool)
+    print(f"added {added} boards, {size} in {args.pool}")
+    if size < args.fill:
+        print(f"gave up after {MAX_TRIES} boards in a row outside the band", file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
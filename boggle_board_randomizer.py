@@ -19,17 +19,72 @@ LETTERS = [
     ['T', 'E', 'R', 'W', 'H', 'V'],
     ['N', 'U', 'I', 'H', 'M', 'QU']
 ]
+# Big Boggle dice, for a 5x5 board.
+BIG_LETTERS = [
+    ['A', 'A', 'A', 'F', 'R', 'S'],
+    ['A', 'A', 'E', 'E', 'E', 'E'],
+    ['A', 'A', 'F', 'I', 'R', 'S'],
+    ['A', 'D', 'E', 'N', 'N', 'N'],
+    ['A', 'E', 'E', 'E', 'E', 'M'],
+    ['A', 'E', 'E', 'G', 'M', 'U'],
+    ['A', 'E', 'G', 'M', 'N', 'N'],
+    ['A', 'F', 'I', 'R', 'S', 'Y'],
+    ['B', 'J', 'K', 'QU', 'X', 'Z'],
+    ['C', 'C', 'N', 'S', 'T', 'W'],
+    ['C', 'E', 'I', 'I', 'L', 'T'],
+    ['C', 'E', 'I', 'L', 'P', 'T'],
+    ['C', 'E', 'I', 'P', 'S', 'T'],
+    ['D', 'H', 'H', 'N', 'O', 'T'],
+    ['D', 'H', 'H', 'L', 'O', 'R'],
+    ['D', 'H', 'L', 'N', 'O', 'R'],
+    ['D', 'D', 'L', 'N', 'O', 'R'],
+    ['E', 'I', 'I', 'I', 'T', 'T'],
+    ['E', 'M', 'O', 'T', 'T', 'T'],
+    ['E', 'N', 'S', 'S', 'S', 'U'],
+    ['F', 'I', 'P', 'R', 'S', 'Y'],
+    ['G', 'O', 'R', 'R', 'V', 'W'],
+    ['H', 'I', 'P', 'R', 'R', 'Y'],
+    ['N', 'O', 'O', 'T', 'U', 'W'],
+    ['O', 'O', 'O', 'T', 'T', 'U']
+]
+# A 6x6 board uses the Big Boggle dice plus the first 11 of the classic dice (which leaves out the second 'QU').
+SUPER_BIG_LETTERS = BIG_LETTERS + LETTERS[:11]
+DICE_SETS = {4: LETTERS, 5: BIG_LETTERS, 6: SUPER_BIG_LETTERS}
+
+
+def get_dice_set(board_size):
+    """A function that returns the dice used for a board of board_size x board_size."""
+    if board_size not in DICE_SETS:
+        raise ValueError(f"no dice set for a {board_size}x{board_size} board, sizes are {sorted(DICE_SETS)}")
+    return DICE_SETS[board_size]
 
 
-def randomize_board(dice_list=LETTERS):
+def randomize_board(dice_list=LETTERS, board_size=BOARD_SIZE, rng=random):
+    """A function that rolls a random board of board_size x board_size from dice_list. 'rng' is the random number
+    generator to use (a random.Random), by default the one shared through the random module.
+    A generator seeded the same way always gives the same board."""
+    if len(dice_list) < board_size * board_size:
+        raise ValueError(f"a {board_size}x{board_size} board needs {board_size * board_size} dice, "
+                         f"got {len(dice_list)}")
     dice_indices = list(range(len(dice_list)))
-    random.shuffle(dice_indices)
+    rng.shuffle(dice_indices)
+    choice = rng.choice
     board = []
-    for i in range(BOARD_SIZE):
+    for i in range(board_size):
         row = []
-        for j in range(BOARD_SIZE):
-            die = dice_list[dice_indices[i * 4 + j]]
-            letter = random.choice(die)
+        for j in range(board_size):
+            die = dice_list[dice_indices[i * board_size + j]]
+            letter = choice(die)
             row.append(letter)
         board.append(row)
-    return board
\ No newline at end of file
+    return board
+
+
+def board_from_seed(seed, board_size=BOARD_SIZE, dice_list=None, rng=None):
+    """A function that returns the board of a seed: always the same board for the same seed, board size and dice
+    (by default the dice set of that size). For bulk generation, pass the same random.Random as 'rng' every time;
+    it is reseeded instead of building a new generator per board."""
+    if rng is None:
+        rng = random.Random()
+    rng.seed(seed)
+    return randomize_board(dice_list or get_dice_set(board_size), board_size, rng)
@@ -0,0 +1,102 @@
+"""Compact board, path and solution formats for storing many solved boards.
+
+A board is a bytes object of n*n letter codes, row by row. The codes belong to an Alphabet; in the default one
+0-25 are 'A'-'Z' and QU_CODE is the 'QU' die. A path is a bytes object of die numbers (row * n + col).
+A solution set is stored as its board followed by one path per word; the words themselves are not stored since the
+board and path spell them.
+"""
+
+QU_CODE = 26
+MAX_ALPHABET_SIZE = 256  # codes are one byte
+
+
+class Alphabet:
+    """The letters dice can show, each with a one byte code. A letter is whatever one die face shows: one
+    character or several (like 'QU'), in any script."""
+    def __init__(self, letters):
+        """A method that gives each letter, in order, the next code."""
+        self.letters = list(letters)
+        if len(self.letters) > MAX_ALPHABET_SIZE:
+            raise ValueError(f"an alphabet has at most {MAX_ALPHABET_SIZE} letters, got {len(self.letters)}")
+        self._codes = {letter: code for code, letter in enumerate(self.letters)}
+
+    def __len__(self):
+        return len(self.letters)
+
+    def __contains__(self, letter):
+        return letter in self._codes
+
+    def encode_board(self, board):
+        """A method that turns a board (list of rows of letters) into its compact form."""
+        try:
+            return bytes(self._codes[letter] for row in board for letter in row)
+        except KeyError as error:
+            raise ValueError(f"{error.args[0]!r} has no compact letter code") from None
+
+    def decode_board(self, data):
+        """A method that turns a compact board back into a list of rows of letters."""
+        size = _board_size(len(data))
+        letters = [self.letters[code] for code in data]
+        return [letters[i:i + size] for i in range(0, len(letters), size)]
+
+
+DEFAULT_ALPHABET = Alphabet([chr(ord('A') + i) for i in range(26)] + ['QU'])
+
+
+def is_compact(value):
+    """A function that checks if a board or path is in the compact (bytes) form."""
+    return isinstance(value, (bytes, bytearray, memoryview))
+
+
+def encode_board(board, alphabet=DEFAULT_ALPHABET):
+    """A function that turns a board (list of rows of letters) into its compact form."""
+    return alphabet.encode_board(board)
+
+
+def decode_board(data, alphabet=DEFAULT_ALPHABET):
+    """A function that turns a compact board back into a list of rows of letters."""
+    return alphabet.decode_board(data)
+
+
+def encode_path(path, board_size):
+    """A function that turns a path (list of (row, col) coordinates) into its compact form."""
+    return bytes(row * board_size + col for row, col in path)
+
+
+def decode_path(data, board_size):
+    """A function that turns a compact path back into a list of (row, col) coordinates."""
+    return [divmod(cell, board_size) for cell in data]
+
+
+def pack_solutions(board, solutions, alphabet=DEFAULT_ALPHABET):
+    """A function that packs a board and its solutions (word -> path, see solve_board) into bytes:
+    the board size, the compact board, then for each word its path length and compact path."""
+    size = len(board)
+    data = bytearray([size])
+    data += alphabet.encode_board(board)
+    for path in solutions.values():
+        data.append(len(path))
+        data += encode_path(path, size)
+    return bytes(data)
+
+
+def unpack_solutions(data, alphabet=DEFAULT_ALPHABET):
+    """A function that unpacks bytes made by pack_solutions. Returns the board and its word -> path dictionary."""
+    size = data[0]
+    position = 1 + size * size
+    board = alphabet.decode_board(data[1:position])
+    solutions = {}
+    while position < len(data):
+        length = data[position]
+        path = decode_path(data[position + 1:position + 1 + length], size)
+        solutions["".join(board[row][col] for row, col in path)] = path
+        position += 1 + length
+    return board, solutions
+
+
+def _board_size(cells):
+    """A helper function that returns the side of a square board with 'cells' dice."""
+    size = int(round(cells ** 0.5))
+    if size * size != cells:
+        raise ValueError(f"a compact board needs a square number of dice, got {cells}")
+    return size
@@ -0,0 +1,150 @@
+import mmap
+import os
+import struct
+import sys
+import unicodedata
+from array import array
+
+INDEX_MAGIC = b"BGDX"
+INDEX_VERSION = 2
+INDEX_SUFFIX = ".idx"
+STAMP_SUFFIX = ".key"  # remembers the content key of a word file until the file changes
+INDEX_CACHE_ENV = "BOGGLE_INDEX_CACHE"  # where compiled indexes are kept, by default index_cache/ next to this file
+DEFAULT_INDEX_CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "index_cache")
+_HEADER = struct.Struct("<4sII4x")  # magic, version, number of words, padding
+
+
+def compile_words_index(text_path, index_path=None):
+    """A function that compiles a word file into a compact binary index and returns the index path.
+    The index holds a header, a table of (words + 1) little endian offsets and the sorted words packed back to back,
+    so it can be memory mapped and searched without building a Python object per word.
+    Offsets are counted from the start of the file, so a word is a single slice of the mapped file."""
+    if index_path is None:
+        index_path = index_path_for(text_path)
+    with open(text_path, encoding="utf-8") as data_file:
+        words = sorted({normalize_word(line) for line in data_file} - {""})
+    data_start = _HEADER.size + 4 * (len(words) + 1)
+    offsets = array("I", [data_start])
+    data = bytearray()
+    for word in words:
+        data += word.encode("utf-8")
+        offsets.append(data_start + len(data))
+    if sys.byteorder != "little":
+        offsets.byteswap()
+    write_atomically(index_path, _HEADER.pack(INDEX_MAGIC, INDEX_VERSION, len(words)) + offsets.tobytes() + data)
+    return index_path
+
+
+def write_atomically(file_path, data):
+    """A function that writes a file next to its final name and renames it into place, so a reader never
+    sees it half written."""
+    file_dir = os.path.dirname(os.path.abspath(file_path))
+    os.makedirs(file_dir, exist_ok=True)
+    import tempfile  # imported here, like hashlib, to keep it off the game's startup path
+    with tempfile.NamedTemporaryFile("wb", dir=file_dir, suffix=".tmp", delete=False) as out_file:
+        out_file.write(data)
+    os.replace(out_file.name, file_path)
+
+
+def normalize_word(line):
+    """A function that turns a line of a word file into the word as dice spell it: stripped, upper case and with
+    accents composed (Unicode NFC), so a dictionary in any script or case matches its dice."""
+    word = line.strip()
+    if word.isascii():
+        return word.upper()
+    return unicodedata.normalize("NFC", word).upper()
+
+
+def get_content_key(text_path):
+    """A function that returns the key of a word file's compiled index: a hash of the file's contents and of the
+    index version, so any copy of the same word file shares one index and an edited file gets a new one.
+    The key is remembered in the index cache with the file's size and modification time, so the file is only
+    hashed again once it changes."""
+    import hashlib
+    stat = os.stat(text_path)
+    stamp = f"{stat.st_mtime_ns} {stat.st_size}"
+    path_key = hashlib.sha256(os.path.abspath(text_path).encode("utf-8")).hexdigest()[:32]
+    stamp_path = os.path.join(get_index_cache_dir(), path_key + STAMP_SUFFIX)
+    try:
+        with open(stamp_path, encoding="ascii") as stamp_file:
+            stored_stamp, _, key = stamp_file.read().rpartition(" ")
+        if stored_stamp == stamp:
+            return key
+    except (OSError, ValueError):
+        pass
+    digest = hashlib.sha256(INDEX_VERSION.to_bytes(4, "little"))
+    with open(text_path, "rb") as data_file:
+        for block in iter(lambda: data_file.read(1 << 20), b""):
+            digest.update(block)
+    key = digest.hexdigest()[:32]
+    try:
+        write_atomically(stamp_path, f"{stamp} {key}".encode("ascii"))
+    except OSError:
+        pass  # a read only cache only costs hashing the file on every load
+    return key
+
+
+def get_index_cache_dir():
+    """A function that returns the index cache directory (BOGGLE_INDEX_CACHE, by default index_cache/ next to
+    this module)."""
+    return os.environ.get(INDEX_CACHE_ENV) or DEFAULT_INDEX_CACHE_DIR
+
+
+def index_path_for(text_path):
+    """A function that returns the path of the compiled index of a word file, in the index cache."""
+    return os.path.join(get_index_cache_dir(), get_content_key(text_path) + INDEX_SUFFIX)
+
+
+def is_index_fresh(text_path, index_path=None):
+    """A function that checks if the compiled index of a word file exists. Indexes are keyed by the word file's
+    contents, so one that exists is always up to date."""
+    if index_path is None:
+        index_path = index_path_for(text_path)
+    return os.path.exists(index_path)
+
+
+def ensure_index(text_path):
+    """A function that returns the path of a word file's compiled index, compiling it first if it isn't cached."""
+    index_path = index_path_for(text_path)
+    if not os.path.exists(index_path):
+        compile_words_index(text_path, index_path)
+    return index_path
+
+
+class PackedWords:
+    """A read only, sorted sequence of words backed by a memory mapped index file.
+    Words are decoded only when they are looked at, so opening the index costs almost nothing."""
+    def __init__(self, index_path):
+        """A method that maps the index file and checks its header."""
+        with open(index_path, "rb") as index_file:
+            self._map = mmap.mmap(index_file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, count = _HEADER.unpack_from(self._map)
+        if magic != INDEX_MAGIC or version != INDEX_VERSION:
+            raise ValueError(f"{index_path} is not a compiled word index")
+        start = _HEADER.size
+        data_start = start + 4 * (count + 1)
+        if sys.byteorder == "little":
+            self._offsets = memoryview(self._map)[start:data_start].cast("I")
+        else:
+            self._offsets = array("I", self._map[start:data_start])
+            self._offsets.byteswap()
+        self._count = count
+
+    def __len__(self):
+        return self._count
+
+    def __getitem__(self, i):
+        # This is the innermost call of every binary search, so it is kept to one slice.
+        # Only 0 <= i < len(self) is supported; out of range indices may raise IndexError or return garbage.
+        offsets = self._offsets
+        return self._map[offsets[i]:offsets[i + 1]].decode("utf-8")
+
+    def __iter__(self):
+        for i in range(self._count):
+            yield self[i]
+
+
+if __name__ == '__main__':
+    from boggle_languages import ENGLISH
+    text_path = sys.argv[1] if len(sys.argv) > 1 else ENGLISH.dict_path
+    print(ensure_index(text_path))
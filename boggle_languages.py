@@ -0,0 +1,125 @@
+"""Languages: a dictionary together with the dice that play it.
+
+English (the default) uses boggle_dict.txt and the classic dice. Other languages are described by a JSON file:
+    {"name": "es",
+     "dictionary": "es_words.txt",
+     "dice": {"4": [["A", "E", "I", "O", "U", "LL"], ["C", "H", "CH", "R", "RR", "Ñ"], ...]}}
+The dictionary path is relative to the JSON file, there is one list of dice per board size, and a die face may show
+one letter or several (like 'QU', 'CH' or 'LL') in any script. Words and faces are compared as
+boggle_dict_index.normalize_word spells them (upper case, NFC).
+
+Example:
+    python boggle.py 4 es.json
+"""
+import json
+import os
+import threading
+from boggle_utils import *
+from boggle_compact import DEFAULT_ALPHABET, Alphabet
+
+DICT_PATH = "boggle_dict.txt"
+
+_languages_lock = threading.Lock()
+
+
+class Language:
+    """A word file and the dice sets (board size -> list of dice, each a list of faces) that play it."""
+    def __init__(self, name, dict_path, dice_sets, alphabet=None):
+        """A method that initializes instance variables. The alphabet (the compact codes of the faces, see
+        boggle_compact) is made from the faces of the dice unless one is given; it may have letters no die shows."""
+        self.name = name
+        self.dict_path = dict_path
+        self.dice_sets = dice_sets
+        self._faces = {face for dice in dice_sets.values() for die in dice for face in die}
+        if alphabet is None:
+            alphabet = Alphabet(sorted(self._faces))
+        self.alphabet = alphabet
+        self._single_letters = {face for face in self._faces if len(face) == 1}
+        self._multi_letter_starts = {face[0] for face in self._faces if len(face) > 1}
+        self._face_lengths = sorted({len(face) for face in self._faces}, reverse=True)
+
+    def __repr__(self):
+        return f"Language({self.name!r}, {self.dict_path!r})"
+
+    def get_faces(self):
+        """A getter method for the faces of the language's dice, sorted."""
+        return sorted(self._faces)
+
+    def get_dice_set(self, board_size):
+        """A method that returns the dice used for a board of board_size x board_size."""
+        if board_size not in self.dice_sets:
+            raise ValueError(f"no {self.name} dice set for a {board_size}x{board_size} board, "
+                             f"sizes are {sorted(self.dice_sets)}")
+        return self.dice_sets[board_size]
+
+    def get_words(self):
+        """A method that returns the language's shared PrefixIndex (see get_words_index), loading it on first use."""
+        return get_words_index(self.dict_path)
+
+    def split_word(self, word):
+        """A method that returns every way the dice faces can spell a word, each as a list of faces.
+        The list is empty if no faces can spell it."""
+        if not self._multi_letter_starts.intersection(word):
+            return [list(word)] if self._single_letters.issuperset(word) else []
+        splits = []
+        self._split_from(word, 0, [], splits)
+        return splits
+
+    def _split_from(self, word, position, faces, splits):
+        """A helper method that adds every way to spell word[position:] after 'faces' to 'splits'."""
+        if position == len(word):
+            splits.append(list(faces))
+            return
+        for length in self._face_lengths:
+            face = word[position:position + length]
+            if len(face) == length and face in self._faces:
+                faces.append(face)
+                self._split_from(word, position + length, faces, splits)
+                faces.pop()
+
+
+ENGLISH = Language("en", DICT_PATH, DICE_SETS, DEFAULT_ALPHABET)
+_languages = {ENGLISH.name: ENGLISH}
+_language_files = {}  # absolute JSON file path -> Language loaded from it
+
+
+def register_language(language):
+    """A function that makes a language available by name (see get_language)."""
+    with _languages_lock:
+        _languages[language.name] = language
+
+
+def get_language(name):
+    """A function that returns a language by its name, or loads and registers one from a JSON file path."""
+    with _languages_lock:
+        language = _languages.get(name)
+    if language is not None:
+        return language
+    if name.endswith(".json") and os.path.exists(name):
+        path = os.path.abspath(name)
+        with _languages_lock:
+            language = _language_files.get(path)
+        if language is None:
+            language = _language_files[path] = load_language(path)
+        register_language(language)
+        return language
+    raise ValueError(f"unknown language {name!r}, languages are {get_language_names()}")
+
+
+def get_language_names():
+    """A function that returns the names of the registered languages."""
+    with _languages_lock:
+        return sorted(_languages)
+
+
+def load_language(file_path):
+    """A function that reads a language from its JSON description (see the module docstring)."""
+    with open(file_path, encoding="utf-8") as spec_file:
+        spec = json.load(spec_file)
+    try:
+        name, dict_path, dice = spec["name"], spec["dictionary"], spec["dice"]
+    except KeyError as error:
+        raise ValueError(f"{file_path}: a language needs a {error.args[0]!r}") from None
+    dice_sets = {int(size): [[normalize_word(face) for face in die] for die in dice_list]
+                 for size, dice_list in dice.items()}
+    return Language(name, os.path.join(os.path.dirname(file_path), dict_path), dice_sets)
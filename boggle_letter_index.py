@@ -0,0 +1,386 @@
+"""Reverse lookups over a dictionary: which words some letters, dice or board can make.
+
+Every word is filed under its letter histogram (how many of each die letter it uses, 'QU' being one die), bucketed
+by length and by the set of letters it uses. A query only looks at the buckets whose letter set is a subset of the
+letters it has, so most of the word list is never touched. With a language whose dice have other multi-letter faces
+(see boggle_languages), a word that the faces spell in several ways is filed under each of them.
+The index of a word file is built once and kept in the index cache next to the compiled dictionary (see
+boggle_dict_index), as flat arrays that are memory mapped, so a query in a new process starts at once.
+
+Examples:
+    python boggle_letter_index.py letters AEINRSTQU            # words spelt with those letter tiles
+    python boggle_letter_index.py dice --size 4 --limit 20     # longest words some roll of the 4x4 dice shows
+    python boggle_letter_index.py best SERSPATGLINESERS        # highest scoring word on a board, row by row
+    python boggle_letter_index.py --language es.json letters CHAÑO
+"""
+import argparse
+import bisect
+import collections
+import mmap
+import os
+import struct
+import sys
+import threading
+from array import array
+from boggle_utils import *
+from boggle_dict_index import get_content_key, get_index_cache_dir, write_atomically
+from boggle_languages import ENGLISH, get_language
+
+LETTER_INDEX_MAGIC = b"BGLX"
+LETTER_INDEX_VERSION = 1
+LETTER_INDEX_SUFFIX = ".ltr"
+MASK_BITS = 64  # letters past the 64th share bits of the letter set bitmasks, which only makes them filter less
+# magic, version, flags, letters, longest word (in dice), letter sets, histograms, filed words, histogram bytes,
+# letter bytes
+_HEADER = struct.Struct("<4sIIIIIIIII")
+_AMBIGUOUS = 1  # header flag: some word is filed more than once
+
+_letter_index_cache = {}  # (id(PrefixIndex), language name) -> (PrefixIndex, Language, LetterIndex)
+_letter_index_cache_lock = threading.Lock()
+
+
+def split_into_dice(word, language=ENGLISH):
+    """A function that splits a word into the die letters that spell it, in English reading 'QU' as the one 'QU'
+    die. Returns None if no dice can spell it (like a 'Q' that isn't followed by a 'U')."""
+    splits = language.split_word(word)
+    return splits[0] if splits else None
+
+
+class LetterIndex:
+    """Words filed by letter histogram, as flat arrays: letter sets (bitmasks) sorted by word length (in dice) and
+    then by mask, each with a run of histograms, each with a run of (letter number, count) byte pairs and a run of
+    word numbers in the PrefixIndex of the words."""
+    def __init__(self, words, language=ENGLISH):
+        """A method that files every word that the language's dice can spell."""
+        if not isinstance(words, PrefixIndex):
+            words = PrefixIndex(words)
+        letter_numbers = {letter: number for number, letter in enumerate(language.get_faces())}
+        buckets = collections.defaultdict(lambda: collections.defaultdict(dict))
+        is_ambiguous = False
+        split_word = language.split_word
+        for word_number, word in enumerate(words):
+            splits = split_word(word)
+            if len(splits) > 1:
+                is_ambiguous = True
+                splits = {tuple(sorted(letters)): letters for letters in splits}.values()
+            for letters in splits:
+                histogram = tuple(sorted(collections.Counter(map(letter_numbers.__getitem__, letters)).items()))
+                mask = _get_mask(number for number, _ in histogram)
+                buckets[len(letters)][mask].setdefault(histogram, []).append(word_number)
+        max_length = max(buckets, default=0)
+        length_starts = array("I", [0] * (max_length + 2))
+        masks = array("Q")
+        mask_starts = array("I", [0])
+        histogram_starts = array("I", [0])
+        word_starts = array("I", [0])
+        word_numbers = array("I")
+        histograms = bytearray()
+        for length in range(max_length + 1):
+            length_starts[length] = len(masks)
+            for mask, bucket in sorted(buckets.get(length, {}).items()):
+                masks.append(mask)
+                for histogram, numbers in bucket.items():
+                    for number, count in histogram:
+                        histograms += bytes((number, count))
+                    histogram_starts.append(len(histograms))
+                    word_numbers.extend(numbers)
+                    word_starts.append(len(word_numbers))
+                mask_starts.append(len(histogram_starts) - 1)
+        length_starts[max_length + 1] = len(masks)
+        self._set_tables(words, language, language.get_faces(), is_ambiguous, length_starts, masks, mask_starts,
+                         histogram_starts, word_starts, word_numbers, histograms)
+
+    @classmethod
+    def load(cls, file_path, words, language=ENGLISH):
+        """A method that maps a letter index saved by save(). 'words' must be the PrefixIndex it was built from.
+        Raises ValueError if the file isn't a letter index of this version."""
+        with open(file_path, "rb") as index_file:
+            data = mmap.mmap(index_file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, flags, letter_count, max_length, mask_count, histogram_count, word_count, histogram_bytes, \
+            letter_bytes = _HEADER.unpack_from(data)
+        if magic != LETTER_INDEX_MAGIC or version != LETTER_INDEX_VERSION:
+            raise ValueError(f"{file_path} is not a letter index")
+        position = _HEADER.size
+        tables = []
+        for typecode, count in (("Q", mask_count), ("I", max_length + 2), ("I", mask_count + 1),
+                                ("I", histogram_count + 1), ("I", histogram_count + 1), ("I", word_count)):
+            table, position = _read_table(data, position, typecode, count)
+            tables.append(table)
+        masks, length_starts, mask_starts, histogram_starts, word_starts, word_numbers = tables
+        histograms = memoryview(data)[position:position + histogram_bytes]
+        position += histogram_bytes
+        letters = data[position:position + letter_bytes].decode("utf-8").split("\0")
+        index = cls.__new__(cls)
+        index._set_tables(words, language, letters[:letter_count], flags & _AMBIGUOUS, length_starts, masks,
+                          mask_starts, histogram_starts, word_starts, word_numbers, histograms)
+        return index
+
+    def save(self, file_path):
+        """A method that writes the index to a file that load() can map."""
+        letter_data = "\0".join(self._letters).encode("utf-8")
+        header = _HEADER.pack(LETTER_INDEX_MAGIC, LETTER_INDEX_VERSION, _AMBIGUOUS if self._is_ambiguous else 0,
+                              len(self._letters), self._max_length, len(self._masks), len(self._histogram_starts) - 1,
+                              len(self._word_numbers), len(self._histograms), len(letter_data))
+        tables = [header]
+        for table in (self._masks, self._length_starts, self._mask_starts, self._histogram_starts, self._word_starts,
+                      self._word_numbers):
+            table = array(table.format if isinstance(table, memoryview) else table.typecode, table)
+            if sys.byteorder != "little":
+                table.byteswap()
+            tables.append(table.tobytes())
+        tables += [bytes(self._histograms), letter_data]
+        write_atomically(file_path, b"".join(tables))
+
+    def get_lengths(self):
+        """A getter method for the word lengths (in dice) that have words, shortest first."""
+        starts = self._length_starts
+        return [length for length in range(self._max_length + 1) if starts[length] < starts[length + 1]]
+
+    def words_from_letters(self, letters, min_length=MIN_PATH_LENGTH):
+        """A method that returns every word spelt by a subset of 'letters' (a list of die letters, each usable once),
+        longest first."""
+        counts = collections.Counter(letters)
+        return self._unique([word for histogram in self._find_histograms(counts, min_length, len(letters))
+                             for word in self._get_words(histogram)])
+
+    def words_from_dice(self, dice, min_length=MIN_PATH_LENGTH):
+        """A method that returns every word some roll of 'dice' (a list of dice, each a list of faces) could show,
+        longest first. A word needs a different die for each of its letters."""
+        letter_dice = collections.defaultdict(int)  # die letter -> bitmask of the dice with that face
+        for die, faces in enumerate(dice):
+            for letter in faces:
+                letter_dice[letter] |= 1 << die
+        # No word can use a letter more times than there are dice with that face
+        counts = {letter: bin(dice_mask).count("1") for letter, dice_mask in letter_dice.items()}
+        found = []
+        for histogram in self._find_histograms(collections.Counter(counts), min_length, len(dice)):
+            if _has_dice_for(self._get_histogram(histogram), letter_dice):
+                found += self._get_words(histogram)
+        return self._unique(found)
+
+    def best_word(self, board, words=None):
+        """A method that returns the highest scoring word on a board and its path, as a (word, path) pair, or None
+        if the board has no word. Ties go to the word that sorts first. If 'words' is given, only words in it count.
+        One search of the board (see solve_board) is faster here than looking the board's letters up in the index,
+        which matches far more words than the board has paths for."""
+        solutions = get_playable_words(solve_board(board, self._words if words is None else words,
+                                                   alphabet=self._language.alphabet))
+        if not solutions:
+            return None
+        word = min(solutions, key=lambda found: (-score_word(found), found))
+        return word, solutions[word]
+
+    def _set_tables(self, words, language, letters, is_ambiguous, length_starts, masks, mask_starts,
+                    histogram_starts, word_starts, word_numbers, histograms):
+        """A helper method that sets the index's words, language and tables (see the class docstring)."""
+        self._words = words
+        self._language = language
+        self._letters = letters
+        self._letter_numbers = {letter: number for number, letter in enumerate(letters)}
+        self._is_ambiguous = bool(is_ambiguous)  # if some word is filed more than once
+        self._max_length = len(length_starts) - 2
+        self._length_starts = length_starts
+        self._masks = masks
+        self._mask_starts = mask_starts
+        self._histogram_starts = histogram_starts
+        self._word_starts = word_starts
+        self._word_numbers = word_numbers
+        self._histograms = histograms
+
+    def _find_histograms(self, counts, min_length, max_length):
+        """A helper method that yields the numbers of the histograms whose letters 'counts' covers, from the longest
+        words to the shortest."""
+        have_counts = {}  # letter number -> how many of it there are
+        for letter, count in counts.items():
+            number = self._letter_numbers.get(letter)
+            if number is not None and count > 0:
+                have_counts[number] = count
+        have = _get_mask(have_counts)
+        masks, length_starts, mask_starts = self._masks, self._length_starts, self._mask_starts
+        histogram_starts, histograms = self._histogram_starts, self._histograms
+        submasks = None
+        for length in range(min(max_length, self._max_length), min_length - 1, -1):
+            low, high = length_starts[length], length_starts[length + 1]
+            if low == high:
+                continue
+            if submasks is None and high - low > 1 << bin(have).count("1"):
+                submasks = _get_submasks(have)
+            if submasks is not None:
+                mask_numbers = (_find_sorted(masks, submask, low, high) for submask in submasks)
+                mask_numbers = sorted(number for number in mask_numbers if number is not None)
+            else:
+                mask_numbers = (number for number in range(low, high) if not masks[number] & ~have)
+            for mask_number in mask_numbers:
+                for histogram in range(mask_starts[mask_number], mask_starts[mask_number + 1]):
+                    start, end = histogram_starts[histogram], histogram_starts[histogram + 1]
+                    if all(have_counts.get(histograms[i], 0) >= histograms[i + 1] for i in range(start, end, 2)):
+                        yield histogram
+
+    def _get_histogram(self, histogram):
+        """A helper method that returns a histogram as a tuple of (die letter, count) pairs."""
+        histograms = self._histograms
+        return tuple((self._letters[histograms[i]], histograms[i + 1])
+                     for i in range(self._histogram_starts[histogram], self._histogram_starts[histogram + 1], 2))
+
+    def _get_words(self, histogram):
+        """A helper method that returns the words filed under a histogram."""
+        words = self._words
+        return [words[number] for number in
+                self._word_numbers[self._word_starts[histogram]:self._word_starts[histogram + 1]]]
+
+    def _unique(self, found):
+        """A helper method that drops the repeats of words filed more than once, keeping the first of each."""
+        return list(dict.fromkeys(found)) if self._is_ambiguous else found
+
+
+def get_letter_index(words=None, language=ENGLISH):
+    """A function that returns the LetterIndex of a dictionary (a word file path or a PrefixIndex, by default the
+    language's) for a language's dice. The index of a word file is saved in the index cache, keyed by the file's
+    contents and the dice faces, the first time it is built; a PrefixIndex given directly is indexed in memory."""
+    file_path = None
+    if words is None:
+        file_path = language.dict_path
+    elif isinstance(words, str):
+        file_path = words
+    if file_path is not None:
+        words = get_words_index(file_path)
+    key = (id(words), language.name)
+    with _letter_index_cache_lock:
+        entry = _letter_index_cache.get(key)
+        if entry is None or entry[0] is not words or entry[1] is not language:
+            index = _load_letter_index(file_path, words, language) if file_path is not None else None
+            if index is None:
+                index = LetterIndex(words, language)
+            entry = _letter_index_cache[key] = (words, language, index)
+        return entry[2]
+
+
+def letter_index_path_for(text_path, language=ENGLISH):
+    """A function that returns the path of the saved letter index of a word file for a language's dice faces."""
+    import hashlib
+    faces_key = hashlib.sha256("\0".join(language.get_faces()).encode("utf-8")).hexdigest()[:16]
+    return os.path.join(get_index_cache_dir(), f"{get_content_key(text_path)}-{faces_key}{LETTER_INDEX_SUFFIX}")
+
+
+def _load_letter_index(file_path, words, language):
+    """A helper function that maps the saved letter index of a word file, building and saving it first if needed.
+    Returns None if the index cache can't be used."""
+    try:
+        index_path = letter_index_path_for(file_path, language)
+        if not os.path.exists(index_path):
+            LetterIndex(words, language).save(index_path)
+        return LetterIndex.load(index_path, words, language)
+    except (OSError, ValueError):
+        return None
+
+
+def _read_table(data, position, typecode, count):
+    """A helper function that returns a table of 'count' little endian numbers at 'position' of a mapped file and
+    the position after it."""
+    end = position + array(typecode).itemsize * count
+    if sys.byteorder == "little":
+        return memoryview(data)[position:end].cast(typecode), end
+    table = array(typecode, data[position:end])
+    table.byteswap()
+    return table, end
+
+
+def _find_sorted(values, value, low, high):
+    """A helper function that returns where 'value' is in values[low:high] (sorted), or None if it isn't there."""
+    i = bisect.bisect_left(values, value, low, high)
+    return i if i < high and values[i] == value else None
+
+
+def _get_mask(letter_numbers):
+    """A helper function that returns the letter set bitmask of some letter numbers."""
+    mask = 0
+    for number in letter_numbers:
+        mask |= 1 << (number % MASK_BITS)
+    return mask
+
+
+def _get_submasks(mask):
+    """A helper function that returns every subset of a bitmask, the bitmask included and 0 left out."""
+    submasks = []
+    submask = mask
+    while submask:
+        submasks.append(submask)
+        submask = (submask - 1) & mask
+    return submasks
+
+
+def _has_dice_for(histogram, letter_dice):
+    """A helper function that checks if each letter of a histogram can get a die of its own (bipartite matching).
+    'letter_dice' maps each die letter to the bitmask of the dice that have it."""
+    owners = {}  # die bit -> the letter using that die
+    tried = 0
+
+    def assign(letter):
+        """Finds a die for the letter, moving letters that hold dice to other dice if needed."""
+        nonlocal tried
+        free = letter_dice[letter] & ~tried
+        while free:
+            bit = free & -free
+            tried |= bit
+            if bit not in owners or assign(owners[bit]):
+                owners[bit] = letter
+                return True
+            free = letter_dice[letter] & ~tried
+        return False
+
+    for letter, needed in histogram:
+        for _ in range(needed):
+            tried = 0
+            if not assign(letter):
+                return False
+    return True
+
+
+def _parse_letters(text, language):
+    """A helper function that reads the die letters of a query. In English 'QU' (or a lone 'Q') is the 'QU' die."""
+    text = normalize_word(text)
+    if language is ENGLISH:
+        text = text.replace("QU", "Q").replace("Q", "QU")
+    letters = split_into_dice(text, language)
+    if letters is None:
+        raise ValueError(f"can't read the letters {text!r}")
+    return letters
+
+
+def main(argv=None):
+    """A function that parses the command line and prints the answer to one query."""
+    parser = argparse.ArgumentParser(description="Look up the words some letters, dice or a board can make.")
+    parser.add_argument("--language", default=ENGLISH.name, help="language name or JSON file (default en)")
+    parser.add_argument("--dict", default=None, help="word file (default: the language's)")
+    listing = argparse.ArgumentParser(add_help=False)
+    listing.add_argument("--limit", type=int, default=None, help="print at most this many words")
+    listing.add_argument("--min-length", type=int, default=MIN_PATH_LENGTH, help="shortest word, in dice")
+    queries = parser.add_subparsers(dest="query", required=True)
+    letters_parser = queries.add_parser("letters", parents=[listing], help="words spelt with some letter tiles")
+    letters_parser.add_argument("letters")
+    dice_parser = queries.add_parser("dice", parents=[listing], help="words some roll of a dice set could show")
+    dice_parser.add_argument("--size", type=int, default=BOARD_SIZE, help="board size of the dice set")
+    best_parser = queries.add_parser("best", help="the highest scoring word on a board")
+    best_parser.add_argument("board", help="the board's letters, row by row")
+    args = parser.parse_args(argv)
+    language = get_language(args.language)
+    index = get_letter_index(args.dict, language)
+    if args.query == "best":
+        letters = _parse_letters(args.board, language)
+        size = int(round(len(letters) ** 0.5))
+        if size * size != len(letters):
+            parser.error(f"a board needs a square number of dice, got {len(letters)}")
+        best = index.best_word([letters[i:i + size] for i in range(0, len(letters), size)])
+        print("no words" if best is None else f"{best[0]} ({score_word(best[0])} points) {best[1]}")
+        return
+    if args.query == "letters":
+        found = index.words_from_letters(_parse_letters(args.letters, language), args.min_length)
+    else:
+        found = index.words_from_dice(language.get_dice_set(args.size), args.min_length)
+    print(f"{len(found)} words")
+    for word in found[:args.limit]:
+        print(word)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,83 @@
+"""Load generator for boggle_server: many simulated players submitting random paths as fast as they can.
+
+Example:
+    python boggle_load_client.py --rooms 20 --players 5 --submits 1000
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+from boggle_utils import get_neighbor_cells
+from boggle_server import DEFAULT_HOST, DEFAULT_PORT
+
+PIPELINE = 32  # requests a player keeps in flight
+
+
+def random_path(board, rng):
+    """A function that returns a random walk of 3 to 8 dice on the board. Most walks are not words."""
+    rows, cols = len(board), len(board[0])
+    neighbor_cells = get_neighbor_cells(rows, cols)
+    cell = rng.randrange(rows * cols)
+    path = [cell]
+    for _ in range(rng.randint(2, 7)):
+        choices = [next_cell for next_cell in neighbor_cells[cell] if next_cell not in path]
+        if not choices:
+            break
+        cell = rng.choice(choices)
+        path.append(cell)
+    return [divmod(cell, cols) for cell in path]
+
+
+async def run_player(host, port, room, player, submits, seed):
+    """A function that joins a room as one player and sends 'submits' random paths, keeping several requests in
+    flight. Returns the number of replies received."""
+    rng = random.Random(seed)
+    reader, writer = await asyncio.open_connection(host, port)
+    writer.write(_encode({"op": "join", "room": room, "player": player}))
+    reply = json.loads(await reader.readline())
+    board = reply["board"]
+    replies = 0
+    sent = 0
+    while replies < submits:
+        while sent < submits and sent - replies < PIPELINE:
+            writer.write(_encode({"op": "submit", "path": random_path(board, rng)}))
+            sent += 1
+        await writer.drain()
+        message = json.loads(await reader.readline())
+        if "event" not in message:
+            replies += 1
+    writer.close()
+    return replies
+
+
+async def run_load(host, port, rooms, players, submits, seed):
+    """A function that runs every simulated player at once and returns the total number of replies."""
+    tasks = [run_player(host, port, f"load-{room}", f"player-{player}", submits, seed + room * players + player)
+             for room in range(rooms) for player in range(players)]
+    return sum(await asyncio.gather(*tasks))
+
+
+def _encode(message):
+    """A helper function that turns a message into one compact JSON line."""
+    return (json.dumps(message, separators=(",", ":")) + "\n").encode()
+
+
+def main(argv=None):
+    """A function that parses the command line, runs the load and prints the submit throughput."""
+    parser = argparse.ArgumentParser(description="Generate submit load against a Boggle server.")
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--rooms", type=int, default=10)
+    parser.add_argument("--players", type=int, default=4, help="players per room")
+    parser.add_argument("--submits", type=int, default=500, help="submits per player")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+    start = time.perf_counter()
+    total = asyncio.run(run_load(args.host, args.port, args.rooms, args.players, args.submits, args.seed))
+    elapsed = time.perf_counter() - start
+    print(f"{total} submits in {elapsed:.2f} s: {total / elapsed:.0f} submits/s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,190 @@
+"""Opt-in instrumentation: call counts, latency histograms and internal counters for the hot paths.
+
+Metrics are off unless enabled, and a disabled timed() wrapper costs one flag check per call. Set BOGGLE_METRICS to a
+file path to enable them for a whole run and export them on exit (Prometheus text if the path ends in .prom, JSON
+otherwise). Set BOGGLE_PROFILE to a file path to profile each game with cProfile, or with pyinstrument if
+BOGGLE_PROFILER=pyinstrument and it is installed; the file holds the last game played.
+"""
+import atexit
+import bisect
+import collections
+import contextlib
+import functools
+import json
+import os
+import threading
+import time
+
+METRICS_ENV = "BOGGLE_METRICS"
+PROFILE_ENV = "BOGGLE_PROFILE"
+PROFILER_ENV = "BOGGLE_PROFILER"
+# Upper bounds of the latency histogram buckets, in seconds; the last bucket takes everything slower.
+BUCKETS = (0.00001, 0.00005, 0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, float("inf"))
+
+_enabled = False
+_lock = threading.Lock()
+_counters = collections.Counter()
+_histograms = {}  # name -> [bucket counts, total seconds]
+
+
+def enable():
+    """A function that starts recording metrics."""
+    global _enabled
+    _enabled = True
+
+
+def disable():
+    """A function that stops recording metrics. What was recorded is kept until reset()."""
+    global _enabled
+    _enabled = False
+
+
+def is_enabled():
+    """A function that checks if metrics are being recorded."""
+    return _enabled
+
+
+def reset():
+    """A function that forgets every recorded metric."""
+    with _lock:
+        _counters.clear()
+        _histograms.clear()
+
+
+def count(name, amount=1):
+    """A function that adds 'amount' to a counter, if metrics are enabled."""
+    if _enabled:
+        with _lock:
+            _counters[name] += amount
+
+
+def observe(name, seconds):
+    """A function that records one call of 'name' that took 'seconds', if metrics are enabled."""
+    if _enabled:
+        with _lock:
+            histogram = _histograms.setdefault(name, [[0] * len(BUCKETS), 0.0])
+            histogram[0][bisect.bisect_left(BUCKETS, seconds)] += 1
+            histogram[1] += seconds
+
+
+def timed(name):
+    """A decorator that records the call count and latency of a function under 'name' while metrics are enabled."""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return func(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                observe(name, time.perf_counter() - start)
+        return wrapper
+    return decorator
+
+
+def get_snapshot():
+    """A function that returns the recorded metrics as a dictionary of counters and histograms (latencies in ms)."""
+    with _lock:
+        histograms = {}
+        for name, (buckets, total) in _histograms.items():
+            calls = sum(buckets)
+            histograms[name] = {"calls": calls,
+                                "total_ms": round(total * 1000, 4),
+                                "mean_ms": round(total * 1000 / calls, 4) if calls else 0.0,
+                                "buckets_ms": {_bucket_label(bound, 1000): n for bound, n in zip(BUCKETS, buckets)}}
+        return {"counters": dict(_counters), "histograms": histograms}
+
+
+def to_prometheus():
+    """A function that returns the recorded metrics in the Prometheus text exposition format."""
+    lines = []
+    with _lock:
+        for name, value in sorted(_counters.items()):
+            lines += [f"# TYPE boggle_{name}_total counter", f"boggle_{name}_total {value}"]
+        for name, (buckets, total) in sorted(_histograms.items()):
+            metric = f"boggle_{name}_seconds"
+            lines.append(f"# TYPE {metric} histogram")
+            cumulative = 0
+            for bound, n in zip(BUCKETS, buckets):
+                cumulative += n
+                lines.append(f'{metric}_bucket{{le="{_bucket_label(bound, 1)}"}} {cumulative}')
+            lines += [f"{metric}_sum {total}", f"{metric}_count {cumulative}"]
+    return "\n".join(lines) + "\n"
+
+
+def export(file_path):
+    """A function that writes the recorded metrics to a file: Prometheus text for a .prom path, JSON otherwise."""
+    with open(file_path, "w") as out_file:
+        if file_path.endswith(".prom"):
+            out_file.write(to_prometheus())
+        else:
+            json.dump(get_snapshot(), out_file, indent=2)
+
+
+@contextlib.contextmanager
+def profile(file_path, profiler="cprofile"):
+    """A context manager that profiles its body and writes the result to 'file_path' (see start_profile)."""
+    stop = start_profile(file_path, profiler)
+    try:
+        yield
+    finally:
+        stop()
+
+
+def start_profile(file_path, profiler="cprofile"):
+    """A function that starts profiling and returns a function that stops it and writes the result to 'file_path':
+    cProfile stats, or an HTML report with profiler='pyinstrument'. Only one profile may run at a time."""
+    if profiler == "pyinstrument":
+        from pyinstrument import Profiler
+        session = Profiler()
+        session.start()
+
+        def stop():
+            session.stop()
+            with open(file_path, "w") as out_file:
+                out_file.write(session.output_html())
+        return stop
+    import cProfile
+    session = cProfile.Profile()
+    session.enable()
+
+    def stop():
+        session.disable()
+        session.dump_stats(file_path)
+    return stop
+
+
+def profile_from_env():
+    """A function that returns a profile() context for BOGGLE_PROFILE, or a do-nothing context if it isn't set."""
+    file_path = os.environ.get(PROFILE_ENV)
+    if not file_path:
+        return contextlib.nullcontext()
+    return profile(file_path, os.environ.get(PROFILER_ENV, "cprofile"))
+
+
+def start_profile_from_env():
+    """A function that starts a profile (see start_profile) for BOGGLE_PROFILE and returns the function that stops
+    it, or returns None if BOGGLE_PROFILE isn't set."""
+    file_path = os.environ.get(PROFILE_ENV)
+    if not file_path:
+        return None
+    return start_profile(file_path, os.environ.get(PROFILER_ENV, "cprofile"))
+
+
+def _bucket_label(bound, scale):
+    """A helper function that formats a bucket bound (in seconds) for export."""
+    if bound == float("inf"):
+        return "+Inf"
+    return f"{bound * scale:g}"
+
+
+def _enable_from_env():
+    """A helper function that enables metrics for the whole run, and exports them on exit, if BOGGLE_METRICS is set."""
+    file_path = os.environ.get(METRICS_ENV)
+    if file_path:
+        enable()
+        atexit.register(export, file_path)
+
+
+_enable_from_env()
@@ -0,0 +1,251 @@
+"""Game replay log: an append-only stream of compact binary records, and a tool that re-verifies logged scores.
+
+A log file starts with a header and holds games one after the other. Each game is a start record (wall clock time,
+hint cost and compact board, see boggle_compact), then one record per submitted path (with the points after it) and
+per hint, in the order they happened with their time in the game, and an end record with the final points.
+A game in a language other than English (see boggle_languages) is preceded by a record with the language's name,
+and its board is coded in that language's alphabet.
+Writes are buffered and flushed when a game ends; reading streams one game at a time, so logs of any size can be
+verified in constant memory.
+
+Examples:
+    python boggle_replay.py boggle_games.log                  # verify every finished game, print a summary
+    python boggle_replay.py --verbose --workers 4 *.log       # one JSON line per game as well
+    python boggle_replay.py --language es.json games.log      # games that were played in another language
+"""
+import argparse
+import collections
+import itertools
+import json
+import multiprocessing
+import struct
+import sys
+import time
+from boggle_utils import *
+from boggle_compact import encode_path
+from boggle_languages import ENGLISH, get_language
+
+DEFAULT_DICT = ENGLISH.dict_path
+DEFAULT_BATCH_SIZE = 64
+LOG_MAGIC = b"BGRL\x01"
+WRITE_BUFFER_BYTES = 64 * 1024
+
+_LANGUAGE = struct.Struct("<cB")  # 'L', name length in bytes; then the name (UTF-8) of the next game's language
+_START = struct.Struct("<cdHB")  # 'G', wall clock start time, hint cost, board size; then the compact board
+_SUBMIT = struct.Struct("<cIiB")  # 'S', ms into the game, points after the submit, path length; then the path
+_HINT = struct.Struct("<cIHB")  # 'H', ms into the game, points taken, word length in bytes; then the word (UTF-8)
+_END = struct.Struct("<cIi")  # 'E', ms into the game, final points
+
+_worker_words = None  # the English dictionary of a worker process, loaded once by _init_worker
+
+
+class GameLog:
+    """A buffered writer that appends the games played to a log file."""
+    def __init__(self, file_path):
+        """A method that opens the log for appending, writing its header if the log is new."""
+        self._file = open(file_path, "ab", buffering=WRITE_BUFFER_BYTES)
+        if self._file.tell() == 0:
+            self._file.write(LOG_MAGIC)
+        self._started = None
+        self._board_size = None
+
+    def start_game(self, board, hint_cost=0, language=ENGLISH):
+        """A method that records the start of a game on 'board'. Event times are counted from here."""
+        self._started = time.monotonic()
+        self._board_size = len(board[0])
+        if language is not ENGLISH:
+            name = language.name.encode("utf-8")
+            self._file.write(_LANGUAGE.pack(b"L", len(name)) + name)
+        self._file.write(_START.pack(b"G", time.time(), hint_cost, self._board_size)
+                         + language.alphabet.encode_board(board))
+
+    def log_submit(self, path, points):
+        """A method that records a submitted path and the player's points after it."""
+        self._file.write(_SUBMIT.pack(b"S", self._get_ms(), points, len(path)) + encode_path(path, self._board_size))
+
+    def log_hint(self, word, cost):
+        """A method that records a hint (None if there were no words left) and the points it cost."""
+        data = word.encode("utf-8") if word is not None else b""
+        self._file.write(_HINT.pack(b"H", self._get_ms(), cost, len(data)) + data)
+
+    def end_game(self, points):
+        """A method that records the end of the game and its final points, and flushes the log."""
+        self._file.write(_END.pack(b"E", self._get_ms(), points))
+        self._file.flush()
+        self._started = None
+
+    def close(self):
+        """A method that flushes and closes the log."""
+        self._file.close()
+
+    def _get_ms(self):
+        """A helper method that returns the milliseconds since the game started."""
+        return int((time.monotonic() - self._started) * 1000)
+
+
+def read_games(file_path):
+    """A function that lazily reads the games of a log. Each game is a dictionary with its start time, hint cost,
+    language name, compact board, events and final points (None if the game never ended). A submit event is
+    ('submit', ms, compact path, points) and a hint event is ('hint', ms, word, cost)."""
+    with open(file_path, "rb") as reader:
+        if reader.read(len(LOG_MAGIC)) != LOG_MAGIC:
+            raise ValueError(f"{file_path} is not a game log")
+        game = None
+        language = ENGLISH.name
+        while True:
+            tag = reader.peek(1)[:1]
+            if not tag:
+                break
+            if tag == b"L":
+                _, length = _read_struct(reader, _LANGUAGE)
+                language = _read_bytes(reader, length).decode("utf-8")
+            elif tag == b"G":
+                if game is not None:
+                    yield game  # the previous game never ended
+                _, started, hint_cost, size = _read_struct(reader, _START)
+                game = {"started": started, "hint_cost": hint_cost, "language": language,
+                        "board": _read_bytes(reader, size * size), "events": [], "points": None}
+                language = ENGLISH.name
+            elif game is None:
+                raise ValueError(f"{file_path}: {tag!r} record outside a game")
+            elif tag == b"S":
+                _, ms, points, length = _read_struct(reader, _SUBMIT)
+                game["events"].append(("submit", ms, _read_bytes(reader, length), points))
+            elif tag == b"H":
+                _, ms, cost, length = _read_struct(reader, _HINT)
+                word = _read_bytes(reader, length).decode("utf-8") or None
+                game["events"].append(("hint", ms, word, cost))
+            elif tag == b"E":
+                _, ms, points = _read_struct(reader, _END)
+                game["points"] = points
+                yield game
+                game = None
+            else:
+                raise ValueError(f"{file_path}: unknown record {tag!r}")
+        if game is not None:
+            yield game
+
+
+def verify_game(game, words, language=ENGLISH):
+    """A function that replays a game against its board's solutions and checks the logged points. 'words' and
+    'language' are the dictionary and language the game was played in.
+    Returns a dictionary with the replayed and logged points, whether they match, and the number of the first
+    event whose logged points were wrong (None if there is none)."""
+    board = language.alphabet.decode_board(game["board"])
+    solutions = set(solve_board(board, words))
+    found = set()
+    points = 0
+    first_mismatch = None
+    for number, event in enumerate(game["events"]):
+        if event[0] == "submit":
+            _, _, path, logged_points = event
+            word = is_valid_path(board, path, solutions) if len(path) >= MIN_PATH_LENGTH else None
+            if word is not None and word not in found:
+                found.add(word)
+                points += score_word(word)
+            if logged_points != points and first_mismatch is None:
+                first_mismatch = number
+        else:
+            _, _, word, cost = event
+            if word is not None and (word not in solutions or word in found) and first_mismatch is None:
+                first_mismatch = number  # a hint must be a word on the board that is still to be found
+            points -= cost
+    finished = game["points"] is not None
+    return {"board": board, "words_found": len(found), "points": points,
+            "logged_points": game["points"], "finished": finished,
+            "ok": first_mismatch is None and (not finished or points == game["points"]),
+            "first_mismatch": first_mismatch}
+
+
+def verify_logs(file_paths, dict_path=DEFAULT_DICT, workers=None, batch_size=DEFAULT_BATCH_SIZE, language_files=()):
+    """A function that verifies every game in some logs across a process pool and yields one result per game,
+    in log order. Games are read and sent to the workers in batches, with only a few batches in flight, so memory
+    stays flat however long the logs are. With workers=1 the games are verified in this process.
+    English games are checked against dict_path; games in other languages need their language's JSON file."""
+    games = itertools.chain.from_iterable(read_games(file_path) for file_path in file_paths)
+    batches = iter(lambda: list(itertools.islice(games, batch_size)), [])
+    if workers == 1:
+        _init_worker(dict_path, language_files)
+        for batch in batches:
+            yield from _verify_batch(batch)
+        return
+    max_in_flight = 2 * (workers or multiprocessing.cpu_count())
+    with multiprocessing.Pool(workers, initializer=_init_worker, initargs=(dict_path, language_files)) as pool:
+        in_flight = collections.deque()
+        for batch in batches:
+            in_flight.append(pool.apply_async(_verify_batch, (batch,)))
+            if len(in_flight) >= max_in_flight:
+                yield from in_flight.popleft().get()
+        while in_flight:
+            yield from in_flight.popleft().get()
+
+
+def _init_worker(dict_path, language_files=()):
+    """A helper function that loads the English dictionary and registers the other languages once per worker
+    process. Their dictionaries are loaded when a game first needs them."""
+    global _worker_words
+    _worker_words = get_words_index(dict_path)
+    for file_path in language_files:
+        get_language(file_path)
+
+
+def _verify_batch(batch):
+    """A helper function that verifies a batch of games inside a worker process."""
+    results = []
+    for game in batch:
+        if game["language"] == ENGLISH.name:
+            results.append(verify_game(game, _worker_words))
+        else:
+            try:
+                language = get_language(game["language"])
+            except ValueError as error:
+                results.append({"finished": game["points"] is not None, "ok": False, "error": str(error)})
+                continue
+            results.append(verify_game(game, language.get_words(), language))
+    return results
+
+
+def _read_struct(reader, record):
+    """A helper function that reads one fixed size record."""
+    return record.unpack(_read_bytes(reader, record.size))
+
+
+def _read_bytes(reader, count):
+    """A helper function that reads exactly 'count' bytes, or fails on a cut off log."""
+    data = reader.read(count)
+    if len(data) != count:
+        raise ValueError("the game log ends in the middle of a record")
+    return data
+
+
+def main(argv=None):
+    """A function that parses the command line, verifies the logs and prints a summary.
+    Exits with status 1 if a game's logged points don't match the replay."""
+    parser = argparse.ArgumentParser(description="Re-verify the scores of logged Boggle games.")
+    parser.add_argument("logs", nargs="+", help="game log files")
+    parser.add_argument("--dict", default=DEFAULT_DICT, help=f"word file (default {DEFAULT_DICT})")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: one per core)")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE, help="games sent to a worker at a time")
+    parser.add_argument("--language", action="append", default=[], metavar="JSON",
+                        help="a language some games were played in (see boggle_languages), may be repeated")
+    parser.add_argument("--verbose", action="store_true", help="print one JSON line per game")
+    args = parser.parse_args(argv)
+    totals = collections.Counter()
+    start = time.perf_counter()
+    for file_path in args.language:
+        get_language(file_path)  # fails early on a bad language file
+    for result in verify_logs(args.logs, args.dict, args.workers, args.batch_size, args.language):
+        totals["games"] += 1
+        totals["unfinished"] += not result["finished"]
+        totals["mismatched"] += not result["ok"]
+        if args.verbose or not result["ok"]:
+            print(json.dumps(result, separators=(",", ":")))
+    elapsed = time.perf_counter() - start
+    print(f"{totals['games']} games ({totals['unfinished']} unfinished) verified in {elapsed:.2f} s, "
+          f"{totals['mismatched']} mismatched", file=sys.stderr)
+    if totals["mismatched"]:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
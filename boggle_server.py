@@ -0,0 +1,221 @@
+"""Headless multi-player Boggle server speaking line delimited JSON over TCP.
+
+Each request is one JSON object per line and gets one JSON reply line. A connection plays as one player:
+    {"op": "join", "room": "r1", "player": "ann"}      -> {"ok": true, "board": [...], "seed": 7, "seconds_left": 299.9}
+    {"op": "submit", "path": [[0, 0], [0, 1], [1, 1]]}  -> {"ok": true, "result": "correct", "word": "...", ...}
+    {"op": "scores"}                                    -> {"ok": true, "scores": {"ann": 9}}
+When a room's time runs out every player in it is sent {"event": "game_over", "scores": {...}}.
+The first player to join a room may give a "seed" to play the board of that seed (see board_from_seed), and a
+"language" to play in one of the languages the server was started with (see boggle_languages). Every language's
+dictionary is loaded once at startup and shared, so rooms switch between them without reloading.
+
+Example:
+    python boggle_server.py --port 8765 --seconds 180
+    python boggle_server.py --language es.json --language he.json
+"""
+import argparse
+import asyncio
+import json
+import random
+import traceback
+from boggle_utils import *
+from boggle_languages import ENGLISH, load_language
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+DEFAULT_DICT = ENGLISH.dict_path
+ROOM_SECONDS = 300
+
+
+class PlayerState:
+    """The score of one player in a room. Submits follow the same rules and messages as BoggleModel."""
+    def __init__(self):
+        """A method that initializes instance variables."""
+        self.points = 0
+        self.guessed_words = []
+        self._guessed_set = set()
+
+    def submit(self, board, path, words):
+        """A method that checks a submitted path and scores it. Returns a (result, word, message) tuple,
+        where result is one of 'short', 'incorrect', 'repeated' or 'correct'."""
+        if len(path) < MIN_PATH_LENGTH:
+            return "short", None, "Not enough letters entered"
+        word = is_valid_path(board, path, words)
+        if word is None:
+            return "incorrect", None, "Word is incorrect"
+        if word in self._guessed_set:
+            return "repeated", word, "Word has already been chosen"
+        self.points += score_word(word)
+        self.guessed_words.append(word)
+        self._guessed_set.add(word)
+        return "correct", word, "Word is correct!"
+
+
+class Room:
+    """A game shared by several players: one board, one timer on the event loop and a score per player."""
+    def __init__(self, name, board, words, seconds, on_end, seed=None, language=ENGLISH):
+        """A method that initializes instance variables and starts the room's timer."""
+        loop = asyncio.get_running_loop()
+        self.name = name
+        self.board = board
+        self.seed = seed
+        self.language = language
+        self.words = words
+        self.players = {}  # player name -> PlayerState
+        self.writers = {}  # player name -> stream writer, for pushed events
+        self.deadline = loop.time() + seconds
+        loop.call_later(seconds, self._end)
+        self._on_end = on_end
+
+    def seconds_left(self):
+        """A method that returns the time left in the game."""
+        return max(self.deadline - asyncio.get_running_loop().time(), 0)
+
+    def join(self, player, writer):
+        """A method that adds a player (or reconnects one) and returns their state."""
+        self.writers[player] = writer
+        return self.players.setdefault(player, PlayerState())
+
+    def get_scores(self):
+        """A getter method for every player's points."""
+        return {player: state.points for player, state in self.players.items()}
+
+    def _end(self):
+        """A helper method that tells every player the game is over and removes the room from the server."""
+        line = _encode({"event": "game_over", "room": self.name, "scores": self.get_scores()})
+        for writer in self.writers.values():
+            if writer is not None and not writer.is_closing():
+                writer.write(line)
+        self._on_end(self)
+
+
+class BoggleServer:
+    """Hosts many concurrent rooms. Rooms are created by the first player to join them and removed when they end."""
+    def __init__(self, dict_path=DEFAULT_DICT, room_seconds=ROOM_SECONDS, board_size=BOARD_SIZE, languages=()):
+        """A method that initializes instance variables. English is played with the words of dict_path, and the
+        other languages (see boggle_languages) with their own. Each dictionary is loaded once and shared by every
+        room in its language."""
+        self._languages = {ENGLISH.name: (ENGLISH, get_words_index(dict_path))}
+        for language in languages:
+            language.get_dice_set(board_size)  # fails early if the language can't play this size
+            self._languages[language.name] = (language, language.get_words())
+        self._room_seconds = room_seconds
+        self._board_size = board_size
+        self._board_rng = random.Random()  # reseeded for every room's board, see board_from_seed
+        self.rooms = {}
+        self.submits = 0
+
+    async def serve(self, host=DEFAULT_HOST, port=DEFAULT_PORT):
+        """A method that accepts connections until cancelled."""
+        server = await asyncio.start_server(self.handle_connection, host, port)
+        async with server:
+            await server.serve_forever()
+
+    async def handle_connection(self, reader, writer):
+        """A method that answers one connection's requests, one JSON line at a time."""
+        session = {"room": None, "player": None}
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                try:
+                    reply = self.handle_request(line, session, writer)
+                except Exception:
+                    traceback.print_exc()
+                    reply = {"ok": False, "error": "server error"}
+                writer.write(_encode(reply))
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    def handle_request(self, line, session, writer=None):
+        """A method that handles one request line and returns the reply. 'session' remembers the room and player
+        the connection joined; the room is kept itself rather than its name, since a new room may take the name of
+        one that ended."""
+        try:
+            request = json.loads(line)
+            op = request["op"]
+        except (ValueError, KeyError, TypeError):
+            return {"ok": False, "error": "bad request"}
+        if op == "join":
+            return self._join(request, session, writer)
+        room = session["room"]
+        if room is None or self.rooms.get(room.name) is not room:
+            return {"ok": False, "error": "not in a running game"}
+        if op == "submit":
+            return self._submit(request, session, room)
+        if op == "scores":
+            return {"ok": True, "scores": room.get_scores(), "seconds_left": round(room.seconds_left(), 1)}
+        return {"ok": False, "error": f"unknown op {op!r}"}
+
+    def _join(self, request, session, writer):
+        """A helper method that puts the connection's player in a room, creating the room if needed."""
+        name, player = request.get("room"), request.get("player")
+        if not isinstance(name, str) or not isinstance(player, str):
+            return {"ok": False, "error": "join needs a room and a player"}
+        seed = request.get("seed")
+        if seed is not None and type(seed) is not int:  # not a float or a bool
+            return {"ok": False, "error": "a seed must be an integer"}
+        room = self.rooms.get(name)
+        if room is None:
+            language_name = request.get("language", ENGLISH.name)
+            if not isinstance(language_name, str) or language_name not in self._languages:
+                return {"ok": False, "error": f"unknown language, languages are {sorted(self._languages)}"}
+            language, words = self._languages[language_name]
+            if seed is None:
+                seed = random.randrange(2 ** 32)
+            board = board_from_seed(seed, self._board_size, language.get_dice_set(self._board_size), self._board_rng)
+            room = self.rooms[name] = Room(name, board, words, self._room_seconds, self._remove_room, seed, language)
+        room.join(player, writer)
+        session["room"], session["player"] = room, player
+        return {"ok": True, "room": name, "board": room.board, "seed": room.seed, "language": room.language.name,
+                "seconds_left": round(room.seconds_left(), 1)}
+
+    def _submit(self, request, session, room):
+        """A helper method that validates and scores a submitted path for the connection's player."""
+        try:
+            path = [(row, col) for row, col in request["path"]]
+        except (KeyError, TypeError, ValueError):
+            path = None
+        if path is None or any(type(row) is not int or type(col) is not int for row, col in path):
+            return {"ok": False, "error": "submit needs a path of [row, col] pairs"}
+        self.submits += 1
+        state = room.players[session["player"]]
+        result, word, message = state.submit(room.board, path, room.words)
+        return {"ok": True, "result": result, "word": word, "message": message, "points": state.points}
+
+    def _remove_room(self, room):
+        """A helper method that forgets a room once its game is over."""
+        if self.rooms.get(room.name) is room:
+            del self.rooms[room.name]
+
+
+def _encode(message):
+    """A helper function that turns a message into one compact JSON line."""
+    return (json.dumps(message, separators=(",", ":")) + "\n").encode()
+
+
+def main(argv=None):
+    """A function that parses the command line and runs the server."""
+    parser = argparse.ArgumentParser(description="Run a multi-player Boggle server.")
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--dict", default=DEFAULT_DICT, help=f"word file (default {DEFAULT_DICT})")
+    parser.add_argument("--seconds", type=int, default=ROOM_SECONDS, help="length of a game")
+    parser.add_argument("--size", type=int, default=BOARD_SIZE, help="board size")
+    parser.add_argument("--language", action="append", default=[], metavar="JSON",
+                        help="another language rooms may be played in (see boggle_languages), may be repeated")
+    args = parser.parse_args(argv)
+    languages = [load_language(file_path) for file_path in args.language]
+    server = BoggleServer(args.dict, args.seconds, args.size, languages)
+    try:
+        asyncio.run(server.serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,55 @@
+"""Startup report: which imports `import boggle` pays for and how long the game takes to first paint.
+
+Example:
+    python boggle_startup_profile.py --top 15
+"""
+import argparse
+import os
+import subprocess
+import sys
+
+FIRST_PAINT_ENV = "BOGGLE_REPORT_FIRST_PAINT"  # same as boggle.FIRST_PAINT_ENV, kept here to avoid importing Tk
+
+
+def get_import_times(module="boggle"):
+    """A function that imports a module in a fresh interpreter with -X importtime and returns a list of
+    (module, self microseconds, cumulative microseconds), slowest cumulative first."""
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                            capture_output=True, text=True, check=True)
+    times = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        times.append((name.strip(), int(self_us), int(cumulative_us)))
+    return sorted(times, key=lambda entry: entry[2], reverse=True)
+
+
+def get_first_paint(script="boggle.py"):
+    """A function that launches the game, lets it paint its first frame and returns what it reports
+    (see BoggleGui.run). Needs a display."""
+    env = dict(os.environ, **{FIRST_PAINT_ENV: "1"})
+    result = subprocess.run([sys.executable, script], capture_output=True, text=True, env=env, timeout=60)
+    if result.returncode != 0:
+        return f"failed: {result.stderr.strip().splitlines()[-1] if result.stderr.strip() else result.returncode}"
+    return result.stdout.strip()
+
+
+def main(argv=None):
+    """A function that parses the command line and prints the startup report."""
+    parser = argparse.ArgumentParser(description="Report the startup cost of the Boggle game.")
+    parser.add_argument("--module", default="boggle", help="module to import (default boggle)")
+    parser.add_argument("--top", type=int, default=10, help="number of slowest imports to list")
+    parser.add_argument("--no-paint", action="store_true", help="skip launching the game window")
+    args = parser.parse_args(argv)
+
+    times = get_import_times(args.module)
+    print(f"{'module':<40}{'self ms':>10}{'cumulative ms':>16}")
+    for name, self_us, cumulative_us in times[:args.top]:
+        print(f"{name:<40}{self_us / 1000:>10.1f}{cumulative_us / 1000:>16.1f}")
+    if not args.no_paint:
+        print(get_first_paint())
+
+
+if __name__ == '__main__':
+    main()
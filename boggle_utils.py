@@ -1,152 +1,549 @@
-import itertools
+import bisect
+import collections
+import functools
+import os
+import random
+import threading
 from boggle_board_randomizer import *
+from boggle_dict_index import PackedWords, ensure_index, normalize_word
+import boggle_metrics
+from boggle_compact import DEFAULT_ALPHABET, decode_path, is_compact
 
+_PREFIX_END = "\U0010ffff"  # sorts after any letter, closes a prefix range
+_SHORT_PREFIX_LENGTH = 3
+MIN_PATH_LENGTH = 3  # fewest dice a submitted word may use
+SEED_CACHE_SIZE = 4096  # boards whose solutions solve_seed keeps
+LETTER_COUNT_CACHE_SIZE = 4  # dictionaries (per alphabet) whose letter counts solve_boards_batch keeps
 
+_NO_BOARD = 255  # the character count of a word no board can have, see _get_letter_counts
+_letter_count_cache = {}  # (id(PrefixIndex), id(Alphabet)) -> their letter counts, see solve_boards_batch
+_dictionary_cache = {}  # absolute word file path -> (file stamp, PrefixIndex)
+_dictionary_cache_lock = threading.Lock()
+
+
+@boggle_metrics.timed("load_words_dict")
 def load_words_dict(file_path):
-    """A function that unpacks a word file into a dictionary of words and a default value of 'True' for each word."""
-    with open(file_path) as data_file:
+    """A function that unpacks a word file into a dictionary of words and a default value of 'True' for each word.
+    Words are normalized the way dice spell them (see boggle_dict_index.normalize_word)."""
+    with open(file_path, encoding="utf-8") as data_file:
         words_dict = {}
         for line in data_file:
-            word = line.strip()
-            words_dict[word] = True
+            word = normalize_word(line)
+            if word:
+                words_dict[word] = True
         return words_dict
 
 
-def is_valid_path(board, path, words):
+@boggle_metrics.timed("load_words_index")
+def load_words_index(file_path):
+    """A function that loads a word file as a PrefixIndex. The file is compiled once into the index cache, keyed by
+    its contents (see boggle_dict_index), and the compiled index is memory mapped. If the index can't be written or
+    read, the word file itself is read."""
+    try:
+        return PrefixIndex.from_sorted(PackedWords(ensure_index(file_path)))
+    except (OSError, ValueError):
+        return PrefixIndex(load_words_dict(file_path))
+
+
+def get_words_index(file_path):
+    """A function that returns the process wide, shared PrefixIndex of a word file, loading it on first use.
+    The cache is keyed by the file's path and modification time, so an edited file is reloaded. Any number of word
+    files can be loaded side by side; switching between them costs a lookup."""
+    path = os.path.abspath(file_path)
+    stamp = _file_stamp(path)
+    with _dictionary_cache_lock:
+        entry = _dictionary_cache.get(path)
+        if entry is not None and entry[0] == stamp:
+            return entry[1]
+        index = load_words_index(path)
+        _dictionary_cache[path] = (stamp, index)
+        return index
+
+
+def invalidate_dictionary_cache(file_path=None):
+    """A function that drops a word file from the shared dictionary cache, or every file if no path is given."""
+    with _dictionary_cache_lock:
+        if file_path is None:
+            _dictionary_cache.clear()
+        else:
+            _dictionary_cache.pop(os.path.abspath(file_path), None)
+
+
+def _file_stamp(path):
+    """A helper function that returns what identifies the current version of a word file. Its compiled index is
+    keyed by its contents, so it can't go out of date on its own."""
+    stat = os.stat(path)
+    return stat.st_mtime_ns, stat.st_size
+
+
+@boggle_metrics.timed("is_valid_path")
+def is_valid_path(board, path, words, alphabet=DEFAULT_ALPHABET):
     """A function that returns a word if a path given is valid and the word chosen is in word database.
-     If the path is invalid or the word doesn't exist, function returns None."""
-    word = _build_valid_word(board, path)
-    if word in words:
+     If the path is invalid or the word doesn't exist, function returns None.
+     The board and the path may be given in their compact form (see boggle_compact), coded in 'alphabet'."""
+    board = _as_board(board, alphabet)
+    word = _build_valid_word(board, _as_path(path, len(board[0])))
+    if word is not None and word in words:
         return word
     return None
 
 
 def _build_valid_word(board, path):
-    """A helper function that tests if a path is valid. Function tests 2 things: (1) if the next coordinate in path is a legal selection, and (2) if the letter hasn't been chosen yet.
-     If all three tests pass, the selected letter is added to the word. Word is returned in all cases."""
-    word = ""
-    last_coord = None
-    cur_list = []
-    for coord in path:
-        if _is_next_to(last_coord, coord) and coord not in cur_list:
-            letter = board[coord[0]][coord[1]]
-            word += letter
-            last_coord = coord
-            cur_list.append(coord)
-        else:
-            break
-    return word
+    """A helper function that tests if a path is valid. Function tests 3 things: (1) if the coordinate is on the board,
+    (2) if it is next to the previous coordinate and (3) if the die hasn't been chosen yet.
+    If all tests pass for every coordinate the word is returned, otherwise None is returned."""
+    rows, cols = len(board), len(board[0])
+    neighbor_masks = get_neighbor_masks(rows, cols)
+    allowed = (1 << rows * cols) - 1  # any die may start a path
+    visited = 0
+    letters = []
+    for row, col in path:
+        if not (0 <= row < rows and 0 <= col < cols):
+            return None
+        cell = row * cols + col
+        bit = 1 << cell
+        if not allowed & bit:
+            return None
+        visited |= bit
+        allowed = neighbor_masks[cell] & ~visited
+        letters.append(board[row][col])
+    return "".join(letters)
 
 
-def _is_next_to(cord1, cord2):
-    """A helper function that calculates if a coordinate can be chosen after another coordinate.
-    Coordinate must be adjacent to previous coordinate in any of 8 directions (u,d,l,r,ur,ul,dr,dl)."""
-    if cord1 is None:
-        return True
-    if cord1[0] != cord2[0] and cord1[0] != cord2[0]-1 and cord1[0] != cord2[0]+1:
-        return False
-    if cord1[1] != cord2[1] and cord1[1] != cord2[1]-1 and cord1[1] != cord2[1]+1:
-        return False
-    return True
+@functools.lru_cache(maxsize=None)
+def get_neighbor_cells(rows, cols):
+    """A function that returns, for each die (numbered row * cols + col), a tuple of the dice next to it
+    in any of 8 directions (u,d,l,r,ur,ul,dr,dl). Tables are computed once per board size."""
+    table = []
+    for row in range(rows):
+        for col in range(cols):
+            table.append(tuple(i * cols + j
+                               for i in range(max(row - 1, 0), min(row + 2, rows))
+                               for j in range(max(col - 1, 0), min(col + 2, cols))
+                               if (i, j) != (row, col)))
+    return tuple(table)
+
+
+@functools.lru_cache(maxsize=None)
+def get_neighbor_masks(rows, cols):
+    """A function that returns, for each die, a bitmask of the dice next to it (see get_neighbor_cells)."""
+    return tuple(sum(1 << cell for cell in cells) for cells in get_neighbor_cells(rows, cols))
+
+
+def score_word(word):
+    """A function that returns the number of points a word is worth: its length squared."""
+    return len(word) ** 2
+
+
+def get_playable_words(solutions):
+    """A function that keeps only the solved words (see solve_board) whose path uses enough dice to be submitted."""
+    return {word: path for word, path in solutions.items() if len(path) >= MIN_PATH_LENGTH}
 
 
-def find_length_n_words(n, board, words):
+def get_board_stats(board, words):
+    """A function that solves a board and returns its statistics: the number of playable words, the highest possible
+    score (every playable word found) and the longest word."""
+    solutions = get_playable_words(solve_board(board, words))
+    return {"words": len(solutions),
+            "max_score": sum(score_word(word) for word in solutions),
+            "longest": max(solutions, key=len, default="")}
+
+
+def solve_seed(seed, words, board_size=BOARD_SIZE):
+    """A function that returns the board of a seed (see board_from_seed) and its solutions (see solve_board) as a
+    (board, solutions) pair. 'words' is a PrefixIndex. Each seed is solved once per dictionary and board size, and
+    the most recent results are kept, so they are shared and must not be changed."""
+    return _solve_seed(seed, words, board_size)
+
+
+@functools.lru_cache(maxsize=SEED_CACHE_SIZE)
+def _solve_seed(seed, words, board_size):
+    """A helper function that solves a seed's board, cached by its arguments (given positionally, see solve_seed)."""
+    board = board_from_seed(seed, board_size)
+    return board, solve_board(board, words)
+
+
+@boggle_metrics.timed("find_length_n_words")
+def find_length_n_words(n, board, words, alphabet=DEFAULT_ALPHABET):
     """A function that finds all legal words on the board of 'n' length. The function returns a list of tuple,
     where each tuple contains the word found and the words path (list of coordinates) on the board.
-    The function builds the said list from the dictionary of words."""
-    for word in words:
-        _remove_wrong_length(n, word, words)
-        if words[word] is True:
-            _check_word_by_letter(board, word, words)
-    # Creates tuple list from dictionary
-    tuple_list = _build_tuple_list(words)
-    _reset_dictionary(words)
-    return tuple_list
-
-
-def _check_word_by_letter(board, word, words):
-    """A helper function that tests a word letter by letter to see if it is on the board and legal.
-    The function checks if each letter exists on the board, and if the coordinate is valid. """
-    count_inc_u = 0
-    count_exc_u = 0
-    word_paths = []
-
-    for i, letter in enumerate(word):
-        count_inc_u += 1
-        if letter != 'U' or (letter == 'U' and word[i - 1] != 'Q'):
-            count_exc_u += 1
-            coord = _get_coord(board, letter)
-            # If letter doesnt exist:
-            if not coord:
-                words[word] = False
-                break
-            # Add coordinate to path:
-            word_paths.extend(coord)
-        # Check if coordinate is valid:
-        check = _not_valid_letter(board, word_paths, count_inc_u, count_exc_u, word, letter)
-        if check is True:  # Not valid letter
-            words[word] = False
-            break
-        if check is False:  # Valid letter
-            continue
-        words[word] = list(check)  # Valid word
-
-
-def _get_coord(board, letter):
-    """A helper function that finds the coordinates of any given letter on the board."""
-    coords = []
-    for i in range(len(board)):
-        for j in range(len(board[i])):
-            if letter == 'Q':
-                if board[i][j] == letter + 'U':
-                    coords.append((i, j))
-            elif board[i][j] == letter:
-                coords.append((i,j))
-    return coords
-
-
-def _remove_wrong_length(n, word, words):
-    """A helper function that changes the value of a word in word dictionary to False if the word doesnt exist."""
-    if len(word) != n:
-        words[word] = False
-
-
-def _not_valid_letter(board, word_paths, count_inc_u, count_exc_u, word, letter):
-    """A helper function that checks if the letter that is being tested is valid."""
-    for path in itertools.combinations(word_paths, count_exc_u):
-        path_word = _build_valid_word(board, path)
-        path_word = _del_if_q(path_word, letter, count_inc_u)
-        valid_word = word[:count_inc_u]
-        if path_word == valid_word:
-            if path_word == word:
-                return path
+    The list is filtered from a solve of the board that stops extending paths at 'n' letters (see solve_board)."""
+    return [(word, path) for word, path in solve_board(board, words, max_length=n, alphabet=alphabet).items()
+            if len(word) == n]
+
+
+def solve_boards_batch(boards, words, alphabet=DEFAULT_ALPHABET):
+    """A function that solves many boards against the same dictionary. 'boards' is an array of shape (B, n, n) of
+    letter codes of 'alphabet' (see boggle_compact), or a sequence of boards in any form (lists of rows, compact
+    bytes or arrays of codes). 'words' is a PrefixIndex or a word file path (see get_words_index), whose letter
+    counts are computed once and reused. Returns a list with, for each board, the set of its playable words and the
+    highest possible score.
+    Each board first drops, with vectorized NumPy count matrices, every word whose characters its dice don't have
+    enough of; the path search then only runs over the words that survive. Needs NumPy."""
+    import numpy as np
+    if isinstance(words, str):
+        words = get_words_index(words)
+    elif not isinstance(words, PrefixIndex):
+        raise TypeError("solve_boards_batch needs a PrefixIndex or a word file path, not "
+                        f"{type(words).__name__}")
+    word_list, word_masks, word_counts, letter_counts = _get_letter_counts(words, alphabet)
+    if isinstance(boards, np.ndarray):
+        boards = boards.astype(np.uint8, copy=False).reshape(len(boards), -1)
+    else:
+        boards = np.stack([_get_board_codes(board, alphabet) for board in boards])
+    dice_counts = np.zeros((len(boards), len(alphabet)), dtype=np.uint16)
+    np.add.at(dice_counts, (np.arange(len(boards))[:, None], boards), 1)
+    # Characters on each board's dice, capped below the count of a word no board can have
+    board_counts = np.minimum(dice_counts @ letter_counts, _NO_BOARD - 1).astype(np.uint8)
+    board_masks = _get_char_masks(board_counts)
+    results = []
+    for codes, counts, mask in zip(boards, board_counts, board_masks):
+        candidates = np.flatnonzero((word_masks & ~mask) == 0)
+        candidates = candidates[np.all(word_counts[candidates] <= counts, axis=1)]
+        survivors = PrefixIndex.from_sorted(tuple(word_list[i] for i in candidates))
+        solutions = get_playable_words(solve_board(bytes(codes), survivors, alphabet=alphabet))
+        results.append((set(solutions), sum(score_word(word) for word in solutions)))
+    return results
+
+
+def _get_board_codes(board, alphabet):
+    """A helper function that returns a board in any form as a flat NumPy array of the alphabet's letter codes."""
+    import numpy as np
+    if is_compact(board):
+        return np.frombuffer(board, dtype=np.uint8)
+    if isinstance(board, np.ndarray):
+        return board.astype(np.uint8, copy=False).reshape(-1)
+    return np.frombuffer(alphabet.encode_board(board), dtype=np.uint8)
+
+
+def _get_letter_counts(index, alphabet):
+    """A helper function that returns, for every word of a PrefixIndex, a bitmask of the characters it uses and its
+    count of each character of the alphabet, and the count of each character on each die letter, as NumPy arrays.
+    Computed once per index and alphabet, for the last LETTER_COUNT_CACHE_SIZE of them."""
+    import numpy as np
+    key = (id(index), id(alphabet))
+    entry = _letter_count_cache.get(key)
+    if entry is None or entry[0] is not index or entry[1] is not alphabet:
+        word_list = list(index)
+        chars = sorted({char for letter in alphabet.letters for char in letter})
+        char_codes = np.array([ord(char) for char in chars], dtype=np.uint32)
+        text = np.frombuffer("".join(word_list).encode("utf-32-le"), dtype=np.uint32)
+        columns = np.minimum(np.searchsorted(char_codes, text), len(chars) - 1)
+        valid = char_codes[columns] == text
+        word_ids = np.repeat(np.arange(len(word_list)), [len(word) for word in word_list])
+        counts = np.zeros((len(word_list), len(chars)), dtype=np.uint16)
+        np.add.at(counts, (word_ids[valid], columns[valid]), 1)
+        counts = np.minimum(counts, _NO_BOARD).astype(np.uint8)
+        counts[np.unique(word_ids[~valid]), 0] = _NO_BOARD  # has characters no die shows
+        letter_counts = np.zeros((len(alphabet), len(chars)), dtype=np.uint16)
+        for code, letter in enumerate(alphabet.letters):
+            for char in letter:
+                letter_counts[code, chars.index(char)] += 1
+        entry = (index, alphabet, word_list, _get_char_masks(counts), counts, letter_counts)
+        _letter_count_cache.pop(key, None)
+        while len(_letter_count_cache) >= LETTER_COUNT_CACHE_SIZE:
+            del _letter_count_cache[next(iter(_letter_count_cache))]  # the oldest
+        _letter_count_cache[key] = entry
+    return entry[2:]
+
+
+def _get_char_masks(counts):
+    """A helper function that turns rows of character counts into bitmasks of the characters present. Alphabets of
+    more than 64 characters share bits, which only makes the mask test weaker."""
+    import numpy as np
+    dtype = np.uint32 if counts.shape[1] <= 32 else np.uint64
+    bits = dtype(1) << (np.arange(counts.shape[1], dtype=dtype) % dtype(64))
+    masks = np.zeros(len(counts), dtype=dtype)
+    for column in range(counts.shape[1]):
+        masks[counts[:, column] > 0] |= bits[column]
+    return masks
+
+
+class PrefixIndex:
+    """A read only, sorted word list that is searched as an implicit prefix trie.
+    A trie node is the (start, end) range of the words that share the current prefix."""
+    def __init__(self, words):
+        """A method that initializes instance variables."""
+        self._words = tuple(sorted(words))
+        self._short_nodes = {}
+
+    @classmethod
+    def from_sorted(cls, words):
+        """A method that wraps an already sorted sequence of words (such as PackedWords) without copying it."""
+        index = cls.__new__(cls)
+        index._words = words
+        index._short_nodes = {}
+        return index
+
+    def __len__(self):
+        return len(self._words)
+
+    def __iter__(self):
+        return iter(self._words)
+
+    def __getitem__(self, i):
+        return self._words[i]
+
+    def __contains__(self, word):
+        i = bisect.bisect_left(self._words, word)
+        return i < len(self._words) and self._words[i] == word
+
+    def root(self):
+        """A method that returns the node of the empty prefix (the whole word list)."""
+        return 0, len(self._words)
+
+    def child(self, node, prefix):
+        """A method that narrows 'node' to the words starting with 'prefix'. Returns None if no word does.
+        Nodes of short prefixes are shared by most searches, so they are remembered after the first lookup."""
+        if len(prefix) <= _SHORT_PREFIX_LENGTH:
+            try:
+                return self._short_nodes[prefix]
+            except KeyError:
+                child = self._short_nodes[prefix] = self._find_child(node, prefix)
+                return child
+        return self._find_child(node, prefix)
+
+    def _find_child(self, node, prefix):
+        """A helper method that narrows 'node' to the words starting with 'prefix' by binary search."""
+        start, end = node
+        start = bisect.bisect_left(self._words, prefix, start, end)
+        end = bisect.bisect_left(self._words, prefix + _PREFIX_END, start, end)
+        if start == end:
+            return None
+        return start, end
+
+    def is_word(self, node, prefix):
+        """A method that checks if 'prefix' itself is a word. 'node' must be the node of 'prefix'."""
+        return self._words[node[0]] == prefix
+
+
+@boggle_metrics.timed("solve_board")
+def solve_board(board, words, max_length=None, alphabet=DEFAULT_ALPHABET):
+    """A function that finds every legal word on the board in a single pass. The function returns a dictionary
+    of each word found and its path (list of coordinates) on the board.
+    One depth first search is run from every die, and a path is abandoned as soon as no word starts with it
+    (or, if 'max_length' is given, once it spells that many letters). The board may be compact (see boggle_compact),
+    coded in 'alphabet'."""
+    board = _as_board(board, alphabet)
+    index = _as_prefix_index(words)
+    rows, cols = len(board), len(board[0])
+    letters = [letter for row in board for letter in row]
+    neighbor_cells = get_neighbor_cells(rows, cols)
+    if max_length is None:
+        max_length = len("".join(letters))
+    found = {}
+    nodes = 0
+    for cell in range(len(letters)):
+        nodes += _extend_path(letters, neighbor_cells, index, index.root(), "", [cell], 1 << cell, max_length, found)
+    boggle_metrics.count("solve_board_nodes", nodes)
+    return {word: [divmod(cell, cols) for cell in path] for word, path in found.items()}
+
+
+class SolutionIndex:
+    """A length bucketed index of the words (and their paths) that are still to be found on a board.
+    Removing a word and drawing a random word both take constant time."""
+    def __init__(self, solutions):
+        """A method that initializes instance variables from a word to path dictionary (see solve_board)."""
+        self._paths = dict(solutions)
+        self._buckets = {}  # word length -> list of words
+        self._positions = {}  # word -> position in its bucket
+        for word in self._paths:
+            bucket = self._buckets.setdefault(len(word), [])
+            self._positions[word] = len(bucket)
+            bucket.append(word)
+
+    def __len__(self):
+        return len(self._paths)
+
+    def __contains__(self, word):
+        return word in self._paths
+
+    def get_path(self, word):
+        """A getter method for the path of a word that is still to be found."""
+        return self._paths[word]
+
+    def get_lengths(self):
+        """A getter method for the word lengths that still have words to be found."""
+        return sorted(self._buckets)
+
+    def remove(self, word):
+        """A method that removes a found word. Words that are not in the index are ignored."""
+        if word not in self._paths:
+            return
+        del self._paths[word]
+        bucket = self._buckets[len(word)]
+        position = self._positions.pop(word)
+        last_word = bucket.pop()
+        if last_word != word:
+            bucket[position] = last_word
+            self._positions[last_word] = position
+        if not bucket:
+            del self._buckets[len(word)]
+
+    def random_word(self, rng=random):
+        """A method that returns a random word of a random length, or None if no words are left.
+        'rng' is the random number generator to use (a random.Random), by default the random module's."""
+        if not self._buckets:
+            return None
+        bucket = self._buckets[rng.choice(list(self._buckets))]
+        return rng.choice(bucket)
+
+
+class PathCursor:
+    """The state of a path that is being built one die at a time: its trie node, a bitmask of the dice used and the
+    last die. Each press updates the state in place, so checking the path never walks it again."""
+    def __init__(self, board, words, alphabet=DEFAULT_ALPHABET):
+        """A method that initializes instance variables. The board may be compact (see boggle_compact), coded in
+        'alphabet'."""
+        board = _as_board(board, alphabet)
+        self._board = board
+        self._index = _as_prefix_index(words)
+        self._cols = len(board[0])
+        self._all_dice = (1 << len(board) * self._cols) - 1
+        self._neighbor_masks = get_neighbor_masks(len(board), self._cols)
+        self.reset()
+
+    def reset(self):
+        """A method that empties the path."""
+        self._node = self._index.root()  # None once no word starts with the path
+        self._prefix = ""
+        self._visited = 0
+        self._allowed = self._all_dice  # dice that may be pressed next
+        self._path = []
+
+    def get_path(self):
+        """A getter method for the path's coordinates."""
+        return self._path
+
+    def get_word(self):
+        """A getter method for the letters spelt by the path."""
+        return self._prefix
+
+    def is_legal_move(self, row, col):
+        """A method that checks if a die is unused and next to the last die of the path."""
+        if not (0 <= row < len(self._board) and 0 <= col < self._cols):
+            return False
+        return bool(self._allowed >> (row * self._cols + col) & 1)
+
+    def get_legal_moves(self):
+        """A method that returns the coordinates of every die that may be pressed next."""
+        return [divmod(cell, self._cols) for cell in range(self._all_dice.bit_length()) if self._allowed >> cell & 1]
+
+    def press(self, row, col):
+        """A method that adds a die to the path. Returns False, leaving the path as it was, if the move is illegal."""
+        if not self.is_legal_move(row, col):
             return False
-    return True
+        cell = row * self._cols + col
+        self._prefix += self._board[row][col]
+        if self._node is not None:
+            self._node = self._index.child(self._node, self._prefix)
+        self._visited |= 1 << cell
+        self._allowed = self._neighbor_masks[cell] & ~self._visited
+        self._path.append((row, col))
+        return True
+
+    def is_prefix(self):
+        """A method that checks if some word starts with the path. If not, the path is a dead end."""
+        return self._node is not None
+
+    def is_word(self):
+        """A method that checks if the path spells a word."""
+        return self._node is not None and self._path != [] and self._index.is_word(self._node, self._prefix)
+
+
+@boggle_metrics.timed("find_word_path")
+def find_word_path(board, word, alphabet=DEFAULT_ALPHABET):
+    """A function that returns a path (list of coordinates) that spells 'word' on the board, or None if there is none.
+    The search backtracks from every die that starts the word and only steps to unused neighbours that continue it.
+    A failed (die, position in word, used dice) state is remembered and never searched again, so the work is bounded
+    by the number of distinct states rather than by the number of paths. The board may be compact, coded in
+    'alphabet'."""
+    board = _as_board(board, alphabet)
+    rows, cols = len(board), len(board[0])
+    letters = [letter for row in board for letter in row]
+    if collections.Counter(word) - collections.Counter("".join(letters)):
+        return None  # the board doesn't have enough of some letter
+    neighbor_cells = get_neighbor_cells(rows, cols)
+    failed = set()
+    for cell in range(len(letters)):
+        path = _find_word_from(letters, neighbor_cells, word, 0, cell, 0, failed)
+        if path is not None:
+            boggle_metrics.count("find_word_path_failed_states", len(failed))
+            return [divmod(cell, cols) for cell in reversed(path)]
+    boggle_metrics.count("find_word_path_failed_states", len(failed))
+    return None
+
+
+def _find_word_from(letters, neighbor_cells, word, position, cell, visited, failed):
+    """A helper function that tries to spell word[position:] starting on 'cell'. Returns the cells of the path in
+    reverse order, or None."""
+    letter = letters[cell]
+    if not word.startswith(letter, position):
+        return None
+    visited |= 1 << cell
+    position += len(letter)
+    if position == len(word):
+        return [cell]
+    state = (cell, position, visited)
+    if state in failed:
+        return None
+    for next_cell in neighbor_cells[cell]:
+        if not visited >> next_cell & 1:
+            path = _find_word_from(letters, neighbor_cells, word, position, next_cell, visited, failed)
+            if path is not None:
+                path.append(cell)
+                return path
+    failed.add(state)
+    return None
+
+
+def _as_board(board, alphabet=DEFAULT_ALPHABET):
+    """A helper function that returns a board as a list of rows, decoding it with 'alphabet' if it is compact."""
+    if is_compact(board):
+        return alphabet.decode_board(board)
+    return board
 
 
-def _del_if_q(path_word, letter, count_inc_u):
-    """A helper function that changes the letter 'QU' to 'Q'."""
-    if letter == 'Q' and len(path_word) >= count_inc_u:
-        path_word = path_word[:count_inc_u-1] + path_word[count_inc_u-1].replace('QU', 'Q')
-    return path_word
+def _as_path(path, board_size):
+    """A helper function that returns a path as a list of coordinates, decoding it if it is compact."""
+    if is_compact(path):
+        return decode_path(path, board_size)
+    return path
 
 
-def _build_tuple_list(words):
-    """A helper function that builds the returned list from the dictionary; words that their value is falsed are
-    passed over, and words that their value is not false are packaged into a tuple with their coordinates."""
-    tuple_list = []
-    for word in words:
-        if words[word] is not False:
-            tuple_list.append((word, words[word]))
-    return tuple_list
+def _as_prefix_index(words):
+    """A helper function that returns 'words' as a PrefixIndex, building one if needed."""
+    if isinstance(words, PrefixIndex):
+        return words
+    return PrefixIndex(words)
 
 
-def _reset_dictionary(words):
-    for word in words:
-        words[word] = True
+def _extend_path(letters, neighbor_cells, index, node, prefix, path, visited, max_length, found):
+    """A helper function that adds the last die of the path to the prefix, records the prefix if it is a word,
+    and continues the search to every unused neighbouring die. 'visited' is a bitmask of the dice in the path.
+    Returns the number of search nodes visited."""
+    cell = path[-1]
+    prefix += letters[cell]
+    if len(prefix) > max_length:
+        return 1
+    node = index.child(node, prefix)
+    if node is None:
+        return 1
+    if prefix not in found and index.is_word(node, prefix):
+        found[prefix] = path[:]
+    if len(prefix) == max_length:
+        return 1
+    nodes = 1
+    for next_cell in neighbor_cells[cell]:
+        if not visited >> next_cell & 1:
+            path.append(next_cell)
+            nodes += _extend_path(letters, neighbor_cells, index, node, prefix, path, visited | 1 << next_cell,
+                                  max_length, found)
+            path.pop()
+    return nodes
 
 
 if __name__ == '__main__':
     board = randomize_board(LETTERS)
-    words = load_words_dict("boggle_dict.txt")
+    words = get_words_index("boggle_dict.txt")
     print(find_length_n_words(5, board, words))
\ No newline at end of file